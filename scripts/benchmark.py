@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+"""Benchmark the ORM, the fearow helpers and asqlite3.
+
+Runs against a database file, or against a synthetic database generated
+with fearow.fixtures if --species is given, and prints a table of timings
+in milliseconds. --output writes the results as JSON instead ("-" for
+standard output), one entry per case:
+
+    group, name   what was measured
+    ops           operations per sample, i.e. lookups in a loop
+    samples       how many times the case was timed
+    mean, min, p50, p95
+                  seconds per sample
+    ops_per_sec   ops / mean
+
+Caches that a case is meant to exercise cold (the identity map, derived
+indexes) are cleared before every sample, outside the timed section.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import asqlite3
+import fearow
+from fearow import PokeapiModel, fixtures
+from fearow.breeding import BreedingChart
+from fearow.evolution import EvolutionGraph
+from fearow.learnsets import LearnsetIndex
+from fearow.models import collection
+from fearow.typechart import TypeChart
+
+
+class Runner:
+    def __init__(self, repeat: int, only: list[str]):
+        self.repeat = repeat
+        self.only = only
+        self.results: list[dict] = []
+
+    async def case(self, group, name, body, *, setup=None, ops=1, repeat=None):
+        """Time body() repeat times, calling setup() untimed before each."""
+        if self.only and not any(
+            pattern in "{}.{}".format(group, name) for pattern in self.only
+        ):
+            return
+        samples = []
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                await setup()
+            start = time.perf_counter()
+            await body()
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        mean = statistics.fmean(samples)
+        self.results.append(
+            {
+                "group": group,
+                "name": name,
+                "ops": ops,
+                "samples": len(samples),
+                "mean": mean,
+                "min": samples[0],
+                "p50": _percentile(samples, 0.5),
+                "p95": _percentile(samples, 0.95),
+                "ops_per_sec": ops / mean if mean else None,
+            }
+        )
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+async def _clear_cache():
+    PokeapiModel.__cache__.clear()
+
+
+async def bench_prepare(r: Runner, db: asqlite3.Connection, workdir: pathlib.Path):
+    snapshot = workdir / "schema.json"
+    await PokeapiModel._prepare(db, snapshot)
+
+    await r.case("prepare", "introspect", lambda: PokeapiModel._prepare(db))
+    await r.case("prepare", "snapshot", lambda: PokeapiModel._prepare(db, snapshot))
+    # The identity map holds instances of the classes just replaced.
+    PokeapiModel.__cache__.clear()
+
+
+async def bench_lookups(r: Runner, ids: list[int], sample: list[int]):
+    Species = PokeapiModel.classes.PokemonSpecies
+    names = [fearow.get_name(mon) for mon in await Species.get_many(sample)]
+    misspelled = [name[:-2] + name[-1] for name in names]
+    await Species.name_index()
+
+    async def get_each():
+        for id_ in sample:
+            await Species.get(id_)
+
+    async def get_named():
+        for name in names:
+            await Species.get_named(name)
+
+    async def get_named_fuzzy():
+        for name in misspelled:
+            await Species.get_named(name)
+
+    async def get_random():
+        for _ in sample:
+            await Species.get_random()
+
+    n = len(sample)
+    await r.case("lookup", "get", get_each, setup=_clear_cache, ops=n)
+    await r.case("lookup", "get.cached", get_each, ops=n)
+    await r.case(
+        "lookup",
+        "get_many",
+        lambda: Species.get_many(ids),
+        setup=_clear_cache,
+        ops=len(ids),
+    )
+    await r.case("lookup", "get_named", get_named, ops=n)
+    await r.case("lookup", "get_named.fuzzy", get_named_fuzzy, ops=n)
+    await r.case("lookup", "get_random", get_random, setup=_clear_cache, ops=n)
+
+
+async def bench_backrefs(r: Runner, sample: list[int]):
+    Species = PokeapiModel.classes.PokemonSpecies
+
+    async def lazy():
+        for mon in await Species.get_many(sample):
+            for pokemon in await mon.pokemons:
+                await pokemon.pokemon_moves
+                await pokemon.pokemon_types
+
+    async def prefetched():
+        await collection(await Species.get_many(sample)).prefetch(
+            "pokemons__pokemon_moves", "pokemons__pokemon_types"
+        )
+
+    async def streamed():
+        for mon in await Species.get_many(sample):
+            for pokemon in await mon.pokemons:
+                async for _ in pokemon.stream_backref(
+                    "pokemon_moves", identity_map=False
+                ):
+                    pass
+
+    n = len(sample)
+    await r.case("backref", "lazy", lazy, setup=_clear_cache, ops=n)
+    await r.case("backref", "prefetch", prefetched, setup=_clear_cache, ops=n)
+    await r.case("backref", "stream", streamed, setup=_clear_cache, ops=n)
+
+
+async def bench_methods(r: Runner, sample: list[int]):
+    Species = PokeapiModel.classes.PokemonSpecies
+    mons: list = []
+
+    async def reload():
+        # Fresh instances, so that no relationship is cached on them yet.
+        PokeapiModel.__cache__.clear()
+        mons[:] = await Species.get_many(sample)
+
+    for cls in (TypeChart, LearnsetIndex, BreedingChart, EvolutionGraph):
+
+        async def build(cls=cls):
+            cls.invalidate()
+            await cls.load()
+
+        await r.case("derived", cls.__name__, build)
+
+    def each(fn):
+        async def body():
+            for mon in mons:
+                await fn(mon)
+
+        return body
+
+    def pairwise(fn):
+        async def body():
+            for mon, other in zip(mons, mons[1:] + mons[:1]):
+                await fn(mon, other)
+
+        return body
+
+    n = len(sample)
+    for fn in (
+        fearow.get_mon_types,
+        fearow.get_mon_abilities,
+        fearow.get_base_stats,
+        fearow.get_egg_groups,
+        fearow.get_mon_learnset,
+        fearow.get_evo_line,
+        fearow.get_default_forme,
+    ):
+        await r.case("methods", fn.__name__, each(fn), setup=reload, ops=n)
+    for fn in (fearow.get_mon_matchup_against_mon, fearow.mon_can_mate_with):
+        await r.case("methods", fn.__name__, pairwise(fn), setup=reload, ops=n)
+    for fn in (
+        fearow.get_mon_types_many,
+        fearow.get_mon_abilities_many,
+        fearow.get_base_stats_many,
+        fearow.get_egg_groups_many,
+    ):
+        await r.case(
+            "methods", fn.__name__, lambda fn=fn: fn(mons), setup=reload, ops=n
+        )
+
+
+async def bench_asqlite3(r: Runner, db: asqlite3.Connection, ids: list[int]):
+    statement = "select * " "from pokemon_v2_pokemonspecies " "where id = ?"
+    rng = random.Random(0)
+    ((moves,),) = await db.execute_fetchall(
+        "select count(*) " "from pokemon_v2_pokemonmove"
+    )
+
+    async def point():
+        await db.execute_fetchall(statement, (rng.choice(ids),))
+
+    async def gather():
+        await asyncio.gather(*(db.execute_fetchall(statement, (id_,)) for id_ in ids))
+
+    async def scan():
+        async with db.execute("select * " "from pokemon_v2_pokemonmove") as cursor:
+            async for rows in cursor.chunks():
+                pass
+
+    await r.case("asqlite3", "point", point, repeat=max(1000, r.repeat))
+    await r.case("asqlite3", "gather", gather, ops=len(ids))
+    await r.case("asqlite3", "scan", scan, ops=moves)
+
+
+async def run(args: argparse.Namespace, database: str, workdir: pathlib.Path):
+    r = Runner(args.repeat, args.only)
+    start = time.perf_counter()
+    db = await fearow.connect(
+        database, schema_snapshot=False, result_cache=args.result_cache
+    )
+    connect_time = time.perf_counter() - start
+    try:
+        ids = [
+            id_
+            for id_, in await db.execute_fetchall(
+                "select id " "from pokemon_v2_pokemonspecies"
+            )
+        ]
+        sample = random.Random(args.seed).sample(ids, min(args.sample, len(ids)))
+        await bench_prepare(r, db, workdir)
+        await bench_lookups(r, ids, sample)
+        await bench_backrefs(r, sample)
+        await bench_methods(r, sample)
+        await bench_asqlite3(r, db, ids)
+    finally:
+        await db.close()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": None if args.species is not None else database,
+            "database_bytes": os.path.getsize(database),
+            "species": len(ids),
+            "synthetic": args.species is not None,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "result_cache": args.result_cache,
+            "sample": len(sample),
+            "connect": connect_time,
+        },
+        "results": r.results,
+    }
+
+
+def print_table(report: dict):
+    meta = report["meta"]
+    print(
+        "{species} species, {database_bytes} bytes, Python {python}, "
+        "SQLite {sqlite}".format(**meta)
+    )
+    print(
+        "{:<40}{:>8}{:>10}{:>10}{:>10}{:>12}".format(
+            "case", "ops", "mean ms", "p50 ms", "p95 ms", "ops/s"
+        )
+    )
+    for result in report["results"]:
+        print(
+            "{:<40}{:>8}{:>10.3f}{:>10.3f}{:>10.3f}{:>12.0f}".format(
+                "{group}.{name}".format(**result),
+                result["ops"],
+                result["mean"] * 1000,
+                result["p50"] * 1000,
+                result["p95"] * 1000,
+                result["ops_per_sec"] or 0,
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--database", default=str(fearow.dbfile))
+    source.add_argument(
+        "--species",
+        type=int,
+        help="generate a synthetic database with this many species",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--sample", type=int, default=50, help="species per lookup or helper loop"
+    )
+    parser.add_argument(
+        "--result-cache",
+        action="store_true",
+        help="serve repeated statements from the asqlite3 result cache",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="run only the cases whose group.name contains NAME",
+    )
+    parser.add_argument("--output", metavar="FILE", help='write JSON, "-" for stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = pathlib.Path(tmp)
+        database = args.database
+        if args.species is not None:
+            database = str(workdir / "fixture.sqlite3")
+            fixtures.create(database, species=args.species, seed=args.seed)
+        report = asyncio.run(run(args, database, workdir))
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
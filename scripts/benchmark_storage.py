@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Compare the storage modes of fearow.connect on a read-only workload.
+
+Each mode runs in a fresh interpreter, so the model classes, identity map
+and derived indexes start out empty every time. Times are in seconds:
+
+    connect   fearow.connect(), including copying the database for "memory"
+    point     one "select * ... where id = ?" per species, repeated
+    scan      a full scan of pokemon_v2_pokemonmove
+    learnset  building the learnset index (a join plus a grouped pass)
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import fearow
+from fearow.learnsets import LearnsetIndex
+
+MODES = ("file", "mmap", "memory")
+
+
+async def run(database: str, storage: str, repeat: int) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    db = await fearow.connect(database, storage=storage, schema_snapshot=False)
+    timings["connect"] = time.perf_counter() - start
+
+    ids = [
+        id_
+        for id_, in await db.execute_fetchall(
+            "select id " "from pokemon_v2_pokemonspecies"
+        )
+    ]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for id_ in ids:
+            await db.execute_fetchall(
+                "select * " "from pokemon_v2_pokemonspecies " "where id = ?", (id_,)
+            )
+    timings["point"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        async with db.execute("select * " "from pokemon_v2_pokemonmove") as cursor:
+            async for rows in cursor.chunks():
+                pass
+    timings["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await LearnsetIndex._build(db)
+    timings["learnset"] = time.perf_counter() - start
+
+    await db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("database", nargs="?", default=str(fearow.dbfile))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        json.dump(asyncio.run(run(args.database, args.mode, args.repeat)), sys.stdout)
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                args.database,
+                "--repeat",
+                str(args.repeat),
+                "--mode",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output)
+
+    columns = list(results[MODES[0]])
+    print("{:<8}".format("mode") + "".join("{:>10}".format(c) for c in columns))
+    for mode, timings in results.items():
+        print(
+            "{:<8}".format(mode)
+            + "".join("{:>10.4f}".format(timings[c]) for c in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,7 @@
 # Copyright (C) 2021-2025 PikalaxALT
 # See LICENSE_THIRD_PARTY for the aiosqlite license
 
+from .cache import *
 from .core import *
+from .instrument import *
+from .pool import *
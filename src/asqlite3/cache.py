@@ -0,0 +1,199 @@
+# asqlite3 - A clone of aiosqlite using a ThreadPoolExecutor
+# Copyright (C) 2021-2025 PikalaxALT
+# See LICENSE_THIRD_PARTY for the aiosqlite license
+
+import collections
+import re
+import sqlite3
+import time
+from collections.abc import Hashable, Iterable, Mapping
+from typing import Any, NamedTuple, Optional
+
+__all__ = ("CacheStats", "ResultCache", "is_read_only")
+
+_read_only_pat = re.compile(
+    r"\s*(?:select|values|explain)\b|\s*pragma\s+[^=]*$", re.IGNORECASE
+)
+_cte_pat = re.compile(r"\s*with\b", re.IGNORECASE)
+_write_pat = re.compile(r"\b(?:insert|update|delete|replace)\b", re.IGNORECASE)
+
+
+def is_read_only(sql: str) -> bool:
+    """Conservatively decide whether a statement only reads the database.
+
+    Anything not recognized as a query is treated as a write."""
+    if _read_only_pat.match(sql):
+        return True
+    return _cte_pat.match(sql) is not None and _write_pat.search(sql) is None
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    # entries dropped to stay within max_entries
+    evictions: int
+    # entries found older than the ttl
+    expirations: int
+    # times the whole cache was dropped because the database changed
+    invalidations: int
+    entries: int
+    rows: int
+
+
+class _Entry(NamedTuple):
+    rows: tuple
+    description: Any
+    stored: float
+
+
+class ResultCache:
+    """Results of read-only statements, keyed by statement and parameters.
+
+    Attach with Connection.enable_result_cache(). The connection serves
+    execute_fetchall and cursor reads from here when it can, and drops every
+    entry when the database may have changed: when it runs a statement that
+    is not read-only, when its total_changes count moves, on rollback, and
+    when PRAGMA data_version shows a commit made by another connection. That
+    is read alongside every miss and, unless a ttl is given, before every
+    hit. The least recently used entry is evicted beyond max_entries, results
+    of more than max_entry_rows rows are not stored, and entries older than
+    ttl seconds, if given, are refetched."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        max_entry_rows: int = 1000,
+        ttl: Optional[float] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_entry_rows = max_entry_rows
+        self.ttl = ttl
+        # Bumped by every invalidation, so that results read before it are
+        # not stored after it.
+        self.generation = 0
+        self._entries: collections.OrderedDict[Hashable, _Entry] = (
+            collections.OrderedDict()
+        )
+        self._rows = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key(sql: str, parameters: Iterable) -> Optional[tuple[str, Hashable]]:
+        """Return the key for a statement, or None if its parameters cannot
+        be hashed. Sequences of parameters should already be tuples."""
+        if isinstance(parameters, Mapping):
+            parameters = frozenset(parameters.items())
+        key = (sql, parameters)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Unlike get, neither counts a lookup nor expires the entry.
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None:
+            if time.monotonic() - entry.stored > self.ttl:
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def put(self, key: Hashable, rows: list, description, generation: int) -> bool:
+        """Store a result read while the cache was at the given generation.
+        Returns whether it was stored."""
+        if generation != self.generation or len(rows) > self.max_entry_rows:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(tuple(rows), description, time.monotonic())
+        self._rows += len(rows)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+        return True
+
+    def _remove(self, key: Hashable):
+        self._rows -= len(self._entries.pop(key).rows)
+
+    def invalidate(self):
+        self.generation += 1
+        if self._entries:
+            self._invalidations += 1
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self._hits,
+            self._misses,
+            self._evictions,
+            self._expirations,
+            self._invalidations,
+            len(self._entries),
+            self._rows,
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachedCursor:
+    """Stands in for a sqlite3.Cursor whose rows were read ahead, either
+    from the cache or while checking whether a result is small enough to
+    store. Rows past those are read from cursor, if there are any."""
+
+    rowcount = -1
+    lastrowid = None
+
+    def __init__(
+        self,
+        rows: Iterable,
+        description,
+        connection: sqlite3.Connection,
+        cursor: Optional[sqlite3.Cursor] = None,
+    ):
+        self._rows = collections.deque(rows)
+        self.description = description
+        self.connection = connection
+        self.cursor = cursor
+        self.arraysize = 1 if cursor is None else cursor.arraysize
+
+    def fetchone(self):
+        if self._rows:
+            return self._rows.popleft()
+        return None if self.cursor is None else self.cursor.fetchone()
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        if size is None:
+            size = self.arraysize
+        rows = [self._rows.popleft() for _ in range(min(size, len(self._rows)))]
+        if len(rows) < size and self.cursor is not None:
+            rows += self.cursor.fetchmany(size - len(rows))
+        return rows
+
+    def fetchall(self) -> list:
+        rows = list(self._rows)
+        self._rows.clear()
+        if self.cursor is not None:
+            rows += self.cursor.fetchall()
+        return rows
+
+    def close(self):
+        self._rows.clear()
+        if self.cursor is not None:
+            self.cursor.close()
@@ -7,16 +7,33 @@ import concurrent.futures as cf
 import functools
 import logging
 import sqlite3
-from collections.abc import AsyncIterator, Callable, Generator, Iterable
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Mapping,
+)
 from os import PathLike
 from types import TracebackType
 from typing import Any, Optional, Union
 
+from .cache import CachedCursor, ResultCache, is_read_only
 from .context import contextmanager
 from .cursor import Cursor
+from .instrument import Instrumentation, QueryEvent, normalize_sql, query_tag
 from .types import *
 
-__all__ = ("Cursor", "Connection", "connect")
+__all__ = (
+    "Cursor",
+    "Connection",
+    "InlineConnection",
+    "connect",
+    "connect_inline",
+    "run_inline",
+)
 
 LOG = logging.getLogger("asqlite3")
 LOG.setLevel(logging.DEBUG)
@@ -29,6 +46,13 @@ class Connection:
         self._connection: Optional[sqlite3.Connection] = None
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._executor = cf.ThreadPoolExecutor(max_workers=1)
+        self._pending = 0
+        self.instrumentation: Optional[Instrumentation] = None
+        self.result_cache: Optional[ResultCache] = None
+        # total_changes when the result cache was last checked, and the last
+        # PRAGMA data_version seen on each lane
+        self._changes = 0
+        self._data_versions: dict[int, int] = {}
 
     @property
     def _conn(self):
@@ -41,7 +65,186 @@ class Connection:
         if self._loop is None:
             self._loop = asyncio.get_running_loop()
         real_fn = functools.partial(fn, *args, **kwargs)
-        return await self._loop.run_in_executor(self._executor, real_fn)
+        self._pending += 1
+        try:
+            return await self._loop.run_in_executor(self._executor, real_fn)
+        finally:
+            self._pending -= 1
+
+    async def _execute_sql(
+        self,
+        sql: str,
+        fn: Callable[..., R],
+        *args,
+        tag: Optional[str] = None,
+        phase: str = "execute",
+        count_rows: Optional[Callable[[R], int]] = None,
+    ) -> R:
+        # Like _execute, but reports the statement to the instrumentation,
+        # if any, with how long it waited for the worker and ran on it.
+        if self.instrumentation is None:
+            return await self._execute(fn, *args)
+        timings = []
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings.append((started - submitted, time.perf_counter() - started))
+
+        result = error = None
+        try:
+            result = await self._execute(timed)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            wait, elapsed = timings[0] if timings else (0.0, 0.0)
+            self.instrumentation.record(
+                QueryEvent(
+                    normalize_sql(sql),
+                    tag,
+                    phase,
+                    wait,
+                    elapsed,
+                    count_rows(result) if count_rows and error is None else None,
+                    error,
+                )
+            )
+
+    def instrument(
+        self,
+        instrumentation: Optional[Instrumentation] = None,
+        *,
+        slow_query_threshold: Optional[float] = None,
+    ) -> Instrumentation:
+        """Start collecting statement timings, into a new Instrumentation
+        unless one is given, and return it."""
+        if instrumentation is None:
+            instrumentation = Instrumentation(slow_query_threshold=slow_query_threshold)
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def uninstrument(self):
+        self.instrumentation = None
+
+    def enable_result_cache(
+        self,
+        cache: Optional[ResultCache] = None,
+        *,
+        max_entries: int = 1024,
+        max_entry_rows: int = 1000,
+        ttl: Optional[float] = None,
+    ) -> ResultCache:
+        """Serve repeated read-only statements from memory, using a new
+        ResultCache unless one is given, and return it."""
+        if cache is None:
+            cache = ResultCache(
+                max_entries=max_entries, max_entry_rows=max_entry_rows, ttl=ttl
+            )
+        self.result_cache = cache
+        self._changes = self._conn.total_changes
+        self._data_versions.clear()
+        return cache
+
+    def disable_result_cache(self):
+        self.result_cache = None
+
+    def _invalidate_cache(self):
+        if self.result_cache is not None:
+            self.result_cache.invalidate()
+
+    def _cache_key(self, sql: str, parameters: Iterable):
+        """Return the result cache key for a statement, or None if it must
+        bypass the cache. A statement that may write invalidates it."""
+        if not is_read_only(sql):
+            self.result_cache.invalidate()
+            return None
+        # Writes made through this connection, including by cursors that
+        # bypass execute, show up here before the next read.
+        if (changes := self._conn.total_changes) != self._changes:
+            self.result_cache.invalidate()
+            self._changes = changes
+        return self.result_cache.key(sql, parameters)
+
+    def _note_data_version(self, lane: "Connection", data_version: int):
+        # data_version changes when another connection commits, and is only
+        # comparable between reads on the same connection.
+        if self._data_versions.setdefault(id(lane), data_version) != data_version:
+            self.result_cache.invalidate()
+            self._data_versions[id(lane)] = data_version
+
+    def _lane(self, sql: str) -> "Connection":
+        # The connection that runs sql; ConnectionPool sends reads elsewhere.
+        return self
+
+    def _execute_for_cache(self, sql: str, parameters: Iterable, limit: Optional[int]):
+        # Read the whole result, or enough of it to tell whether it fits in
+        # the cache, and the data_version it was read at.
+        cursor = self._conn.execute(sql, parameters)
+        rows = cursor.fetchall() if limit is None else cursor.fetchmany(limit + 1)
+        return rows, cursor, self._data_version()
+
+    def _data_version(self) -> int:
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        (data_version,) = cursor.execute("pragma data_version").fetchone()
+        cursor.close()
+        return data_version
+
+    async def _cached_read(self, sql: str, parameters: Iterable, *, fetch_all: bool):
+        cache = self.result_cache
+        if not isinstance(parameters, Mapping):
+            parameters = tuple(parameters)
+        key = self._cache_key(sql, parameters)
+        lane = self._lane(sql)
+        tag = query_tag.get()
+        if key is None:
+            if fetch_all:
+                return await lane._fetchall(sql, parameters)
+            return await lane._cursor(sql, parameters)
+        if cache.ttl is None and key in cache:
+            # Without a ttl to bound how stale a hit may be, look for commits
+            # by other connections before serving one.
+            self._note_data_version(lane, await lane._execute(lane._data_version))
+        if (entry := cache.get(key)) is not None:
+            if fetch_all:
+                return list(entry.rows)
+            return Cursor(lane, CachedCursor(entry.rows, entry.description, lane._conn))
+        generation = cache.generation
+        rows, cursor, data_version = await lane._execute_sql(
+            sql,
+            lane._execute_for_cache,
+            sql,
+            parameters,
+            None if fetch_all else cache.max_entry_rows,
+            tag=tag,
+            count_rows=lambda result: len(result[0]),
+        )
+        fresh = generation == cache.generation
+        self._note_data_version(lane, data_version)
+        if fresh:
+            # The rows are current even if data_version shows that older
+            # entries are not.
+            generation = cache.generation
+        stored = cache.put(key, rows, cursor.description, generation)
+        if fetch_all:
+            return rows
+        return Cursor(
+            lane,
+            CachedCursor(
+                rows,
+                cursor.description,
+                lane._conn,
+                # A result too large to store is still being read.
+                None if stored or len(rows) <= cache.max_entry_rows else cursor,
+            ),
+            sql,
+            tag,
+        )
 
     def _execute_insert(self, sql: str, parameters: Iterable):
         cursor = self._conn.execute(sql, parameters)
@@ -87,6 +290,7 @@ class Connection:
 
     async def rollback(self):
         await self._execute(self._conn.rollback)
+        self._invalidate_cache()
 
     async def close(self):
         try:
@@ -96,35 +300,74 @@ class Connection:
         finally:
             self._connection = None
 
+    async def _cursor(self, sql: str, parameters: Iterable) -> Cursor:
+        tag = query_tag.get()
+        return Cursor(
+            self,
+            await self._execute_sql(sql, self._conn.execute, sql, parameters, tag=tag),
+            sql,
+            tag,
+        )
+
+    async def _fetchall(self, sql: str, parameters: Iterable) -> list:
+        return await self._execute_sql(
+            sql,
+            self._execute_fetchall,
+            sql,
+            parameters,
+            tag=query_tag.get(),
+            count_rows=len,
+        )
+
     @contextmanager
     async def execute(self, sql: str, parameters: Optional[Iterable] = None):
         if parameters is None:
             parameters = []
-        return Cursor(self, await self._execute(self._conn.execute, sql, parameters))
+        if self.result_cache is not None:
+            return await self._cached_read(sql, parameters, fetch_all=False)
+        return await self._lane(sql)._cursor(sql, parameters)
 
     @contextmanager
     async def execute_insert(self, sql: str, parameters: Optional[Iterable] = None):
         if parameters is None:
             parameters = []
-        return await self._execute(self._execute_insert, sql, parameters)
+        self._invalidate_cache()
+        return await self._execute_sql(
+            sql, self._execute_insert, sql, parameters, tag=query_tag.get()
+        )
 
     @contextmanager
     async def execute_fetchall(self, sql: str, parameters: Optional[Iterable] = None):
         if parameters is None:
             parameters = []
-        return await self._execute(self._execute_fetchall, sql, parameters)
+        if self.result_cache is not None:
+            return await self._cached_read(sql, parameters, fetch_all=True)
+        return await self._lane(sql)._fetchall(sql, parameters)
 
     @contextmanager
     async def executemany(
         self, sql: str, parameters: Iterable[Iterable] = None
     ) -> Cursor:
+        self._invalidate_cache()
+        tag = query_tag.get()
         return Cursor(
-            self, await self._execute(self._conn.executemany, sql, parameters)
+            self,
+            await self._execute_sql(
+                sql, self._conn.executemany, sql, parameters, tag=tag
+            ),
+            sql,
+            tag,
         )
 
     @contextmanager
     async def executescript(self, script: str) -> Cursor:
-        return Cursor(self, await self._execute(self._conn.executescript, script))
+        self._invalidate_cache()
+        return Cursor(
+            self,
+            await self._execute_sql(
+                script, self._conn.executescript, script, tag=query_tag.get()
+            ),
+        )
 
     async def interrupt(self):
         return self._conn.interrupt()
@@ -167,6 +410,7 @@ class Connection:
     @row_factory.setter
     def row_factory(self, factory: "Optional[type]"):  # py3.5.2 compat (#24)
         self._conn.row_factory = factory
+        self._invalidate_cache()
 
     @property
     def text_factory(self) -> type:
@@ -175,6 +419,7 @@ class Connection:
     @text_factory.setter
     def text_factory(self, factory: type):
         self._conn.text_factory = factory
+        self._invalidate_cache()
 
     @property
     def total_changes(self) -> int:
@@ -223,5 +468,37 @@ class Connection:
         )
 
 
+class InlineConnection(Connection):
+    """Connection that runs every call on the calling thread.
+
+    Its coroutines never suspend, so they can be run to completion without
+    an event loop, with run_inline. Inside an event loop, every call blocks
+    the loop until it returns."""
+
+    def __init__(self, db_path: Union[str, PathLike], **kwargs):
+        super().__init__(db_path, **kwargs)
+        self._executor.shutdown()
+
+    async def _execute(self, fn: Callable[[T, Any], R], *args: T, **kwargs) -> R:
+        return fn(*args, **kwargs)
+
+
+def run_inline(awaitable: Awaitable[R]) -> R:
+    """Run a coroutine whose only I/O goes through InlineConnections, and
+    return its result. Raises RuntimeError if it waits for anything else,
+    such as a task, a sleep or a threaded Connection."""
+    generator = awaitable.__await__()
+    try:
+        generator.send(None)
+    except StopIteration as e:
+        return e.value
+    generator.close()
+    raise RuntimeError("{!r} suspended without an event loop".format(awaitable))
+
+
 def connect(database: Union[str, PathLike], **kwargs):
     return Connection(database, **kwargs)
+
+
+def connect_inline(database: Union[str, PathLike], **kwargs):
+    return InlineConnection(database, **kwargs)
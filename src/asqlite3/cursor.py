@@ -3,10 +3,13 @@
 # See LICENSE_THIRD_PARTY for the aiosqlite license
 
 import sqlite3
+import time
 from collections.abc import AsyncIterator, Callable, Iterable
 from types import TracebackType
 from typing import TYPE_CHECKING, Any, Optional
 
+from .cache import CachedCursor, is_read_only
+from .instrument import query_tag
 from .types import *
 
 if TYPE_CHECKING:
@@ -14,39 +17,130 @@ if TYPE_CHECKING:
 
 
 class Cursor:
-    def __init__(self, connection: "Connection", cursor: sqlite3.Cursor):
+    # Tuning for chunked iteration. Each batch starts from the previous size,
+    # at most doubles, and is bounded by the cap, by the number of values
+    # (rows * columns) and by how long the last batch took on the worker.
+    initial_chunk_size = 64
+    max_chunk_size = 4096
+    max_chunk_cells = 65536
+    target_chunk_time = 0.005
+
+    def __init__(
+        self,
+        connection: "Connection",
+        cursor: sqlite3.Cursor,
+        sql: Optional[str] = None,
+        tag: Optional[str] = None,
+    ):
         self._connection = connection
         self._cursor = cursor
+        # The statement whose rows are being fetched, and the query tag in
+        # effect when it was issued, for instrumentation.
+        self._sql = sql
+        self._tag = tag
+
+    @property
+    def _in_memory(self) -> bool:
+        # Every remaining row came from the result cache or was read ahead.
+        return isinstance(self._cursor, CachedCursor) and self._cursor.cursor is None
 
     async def _execute(self, fn: Callable[[T, Any], R], *args: T, **kwargs) -> R:
+        if self._in_memory:
+            return fn(*args, **kwargs)
         return await self._connection._execute(fn, *args, **kwargs)
 
+    async def _fetch(
+        self, fn: Callable[..., R], *args, count_rows: Callable[[R], int] = len
+    ) -> R:
+        if self._sql is None or self._in_memory:
+            return await self._execute(fn, *args)
+        return await self._connection._execute_sql(
+            self._sql,
+            fn,
+            *args,
+            tag=self._tag,
+            phase="fetch",
+            count_rows=count_rows,
+        )
+
+    def _fetch_chunk(self, size: int) -> tuple[list, float]:
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        return rows, time.perf_counter() - start
+
+    def _next_chunk_size(self, rows: list, elapsed: float, size: int, cap: int):
+        try:
+            width = len(rows[0]) or 1
+        except TypeError:
+            width = 1
+        size = min(cap, size * 2, max(1, self.max_chunk_cells // width))
+        if elapsed > 0:
+            per_row = elapsed / len(rows)
+            size = min(size, max(1, int(self.target_chunk_time / per_row)))
+        return size
+
+    async def chunks(self, max_chunk_size: Optional[int] = None) -> AsyncIterator[list]:
+        """Yield the remaining rows in batches fetched on the worker thread.
+
+        The batch size adapts to row width and fetch time, up to
+        max_chunk_size (default: the max_chunk_size attribute)."""
+        cap = max_chunk_size or self.max_chunk_size
+        size = min(self.initial_chunk_size, cap)
+        while True:
+            rows, elapsed = await self._fetch(
+                self._fetch_chunk, size, count_rows=lambda chunk: len(chunk[0])
+            )
+            if rows:
+                yield rows
+            if len(rows) < size:
+                break
+            size = self._next_chunk_size(rows, elapsed, size, cap)
+
     async def __aiter__(self) -> AsyncIterator:
-        while rows := await self.fetchmany():
+        async for rows in self.chunks():
             for row in rows:
                 yield row
 
+    async def _reset(self, sql: str):
+        if isinstance(self._cursor, CachedCursor):
+            self._cursor = await self._connection._execute(
+                self._connection._conn.cursor
+            )
+        if not is_read_only(sql):
+            self._connection._invalidate_cache()
+        self._sql, self._tag = sql, query_tag.get()
+
     async def execute(self, sql: str, parameters: Optional[Iterable] = None):
-        await self._execute(self._cursor.execute, sql, parameters)
+        await self._reset(sql)
+        await self._connection._execute_sql(
+            sql, self._cursor.execute, sql, parameters, tag=self._tag
+        )
         return self
 
     async def executemany(self, sql: str, parameters: Iterable[Iterable] = None):
-        await self._execute(self._cursor.executemany, sql, parameters)
+        await self._reset(sql)
+        await self._connection._execute_sql(
+            sql, self._cursor.executemany, sql, parameters, tag=self._tag
+        )
         return self
 
     async def executescript(self, script: str):
+        await self._reset(script)
+        self._sql = None
         await self._execute(self._cursor.executescript, script)
         return self
 
     async def fetchone(self):
-        return await self._execute(self._cursor.fetchone)
+        return await self._fetch(
+            self._cursor.fetchone, count_rows=lambda row: int(row is not None)
+        )
 
     async def fetchmany(self, size: int = None):
         params = (size,) if size else ()
-        return await self._execute(self._cursor.fetchmany, *params)
+        return await self._fetch(self._cursor.fetchmany, *params)
 
     async def fetchall(self):
-        return await self._execute(self._cursor.fetchall)
+        return await self._fetch(self._cursor.fetchall)
 
     async def close(self):
         await self._execute(self._cursor.close)
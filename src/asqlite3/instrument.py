@@ -0,0 +1,153 @@
+# asqlite3 - A clone of aiosqlite using a ThreadPoolExecutor
+# Copyright (C) 2021-2025 PikalaxALT
+# See LICENSE_THIRD_PARTY for the aiosqlite license
+
+import contextlib
+import contextvars
+import functools
+import logging
+import re
+from collections.abc import Callable, Iterator
+from typing import NamedTuple, Optional
+
+__all__ = (
+    "Instrumentation",
+    "QueryEvent",
+    "StatementStats",
+    "normalize_sql",
+    "query_tag",
+    "tag_queries",
+)
+
+LOG = logging.getLogger("asqlite3")
+
+query_tag: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "asqlite3_query_tag", default=None
+)
+
+
+@contextlib.contextmanager
+def tag_queries(tag: Optional[str]) -> Iterator[None]:
+    """Label the statements issued inside the block, i.e. with the name of
+    the code that issued them. The label is reported with each QueryEvent."""
+    token = query_tag.set(tag)
+    try:
+        yield
+    finally:
+        query_tag.reset(token)
+
+
+_string_pat = re.compile(r"'(?:[^']|'')*'")
+_number_pat = re.compile(r"\b\d+(?:\.\d+)?\b")
+_in_list_pat = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_space_pat = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Replace literals with placeholders and collapse "in (?, ?, ...)"
+    lists, so that statements differing only in their values group
+    together."""
+    sql = _string_pat.sub("?", sql)
+    sql = _number_pat.sub("?", sql)
+    sql = _in_list_pat.sub("in (...)", sql)
+    return _space_pat.sub(" ", sql).strip()
+
+
+class QueryEvent(NamedTuple):
+    sql: str
+    tag: Optional[str]
+    # "execute" for running a statement, "fetch" for reading rows from a
+    # cursor afterwards
+    phase: str
+    # seconds spent queued behind other work for the worker thread
+    wait: float
+    # seconds spent running on the worker thread
+    elapsed: float
+    # rows returned, or None if the call returns a cursor
+    rows: Optional[int]
+    error: Optional[BaseException]
+
+
+class StatementStats:
+    __slots__ = ("calls", "fetches", "rows", "wait", "elapsed", "max_elapsed", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.fetches = 0
+        self.rows = 0
+        self.wait = 0.0
+        self.elapsed = 0.0
+        self.max_elapsed = 0.0
+        self.errors = 0
+
+    def add(self, event: QueryEvent):
+        if event.phase == "execute":
+            self.calls += 1
+        else:
+            self.fetches += 1
+        self.rows += event.rows or 0
+        self.wait += event.wait
+        self.elapsed += event.elapsed
+        self.max_elapsed = max(self.max_elapsed, event.elapsed)
+        self.errors += event.error is not None
+
+    def __repr__(self):
+        return "<{} {}>".format(
+            self.__class__.__name__,
+            " ".join(
+                "{}={!r}".format(name, getattr(self, name)) for name in self.__slots__
+            ),
+        )
+
+
+class Instrumentation:
+    """Collects timings of the statements run on a connection.
+
+    Attach with Connection.instrument(). Every statement and every fetch
+    from its cursor produces a QueryEvent, which is added to the totals per
+    normalized statement and per tag, logged as a warning if it ran for at
+    least slow_query_threshold seconds, and passed to every hook."""
+
+    def __init__(self, *, slow_query_threshold: Optional[float] = None):
+        self.slow_query_threshold = slow_query_threshold
+        self.hooks: list[Callable[[QueryEvent], None]] = []
+        self._by_sql: dict[str, StatementStats] = {}
+        self._by_tag: dict[Optional[str], StatementStats] = {}
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[QueryEvent], None]):
+        self.hooks.remove(hook)
+
+    def record(self, event: QueryEvent):
+        self._by_sql.setdefault(event.sql, StatementStats()).add(event)
+        self._by_tag.setdefault(event.tag, StatementStats()).add(event)
+        if (
+            self.slow_query_threshold is not None
+            and event.elapsed >= self.slow_query_threshold
+        ):
+            LOG.warning(
+                "slow query (%.3fs, waited %.3fs, tag %s): %s",
+                event.elapsed,
+                event.wait,
+                event.tag,
+                event.sql,
+            )
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                LOG.exception("exception in query hook %r", hook)
+
+    def stats(self) -> dict[str, StatementStats]:
+        """Totals per normalized statement."""
+        return dict(self._by_sql)
+
+    def stats_by_tag(self) -> dict[Optional[str], StatementStats]:
+        return dict(self._by_tag)
+
+    def reset(self):
+        self._by_sql.clear()
+        self._by_tag.clear()
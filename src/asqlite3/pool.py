@@ -0,0 +1,185 @@
+# asqlite3 - A clone of aiosqlite using a ThreadPoolExecutor
+# Copyright (C) 2021-2025 PikalaxALT
+# See LICENSE_THIRD_PARTY for the aiosqlite license
+
+import asyncio
+import itertools
+import os
+import pathlib
+import urllib.parse
+from collections.abc import Callable, Iterable
+from os import PathLike
+from typing import Optional, Union
+
+from .cache import is_read_only
+from .core import Connection
+from .instrument import Instrumentation
+
+__all__ = ("ConnectionPool", "connect_pool", "is_read_only")
+
+
+def _read_only_uri(db_path: Union[str, PathLike], uri: bool) -> str:
+    db_path = os.fspath(db_path)
+    if uri and db_path.startswith("file:"):
+        parts = urllib.parse.urlsplit(db_path)
+        query = [
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(parts.query)
+            if key != "mode"
+        ]
+        if dict(query).get("cache") == "shared" or ":memory:" in parts.path:
+            raise ValueError("pooled connections need a database file")
+        query.append(("mode", "ro"))
+        return urllib.parse.urlunsplit(
+            parts._replace(query=urllib.parse.urlencode(query))
+        )
+    if db_path in ("", ":memory:"):
+        raise ValueError("pooled connections need a database file")
+    return pathlib.Path(db_path).absolute().as_uri() + "?mode=ro"
+
+
+class ConnectionPool(Connection):
+    """Connection with a pool of read-only reader lanes.
+
+    Each reader lane is a :class:`Connection` with its own worker thread and
+    ``mode=ro`` sqlite3 connection. Statements recognized by
+    :func:`is_read_only` are sent to the least busy reader; everything else,
+    as well as reads issued while a transaction is open, goes to the single
+    writer lane, which is this connection itself."""
+
+    def __init__(
+        self, db_path: Union[str, PathLike], readers: Optional[int] = None, **kwargs
+    ):
+        super().__init__(db_path, **kwargs)
+        if readers is None:
+            readers = os.cpu_count() or 1
+        if readers < 1:
+            raise ValueError("readers must be a positive integer")
+        reader_uri = _read_only_uri(db_path, kwargs.get("uri", False))
+        reader_kwargs = kwargs | {"uri": True}
+        self._readers = [
+            Connection(reader_uri, **reader_kwargs) for _ in range(readers)
+        ]
+        self._next_reader = itertools.cycle(range(readers))
+
+    @property
+    def readers(self) -> int:
+        return len(self._readers)
+
+    def _lane(self, sql: str) -> Connection:
+        if not is_read_only(sql) or self.in_transaction:
+            return self
+        # Start the search at a rotating offset so ties are spread around.
+        start = next(self._next_reader)
+        lanes = self._readers[start:] + self._readers[:start]
+        return min(lanes, key=lambda lane: lane._pending)
+
+    @property
+    def _lanes(self) -> list[Connection]:
+        return [self, *self._readers]
+
+    async def _on_all_lanes(self, method: Callable, *args, **kwargs):
+        return await asyncio.gather(
+            *(method(lane, *args, **kwargs) for lane in self._lanes)
+        )
+
+    async def _connect(self):
+        await super()._connect()
+        try:
+            await asyncio.gather(*(reader._connect() for reader in self._readers))
+        except Exception:
+            await self.close()
+            raise
+        return self
+
+    async def close(self):
+        await asyncio.gather(
+            super().close(), *(reader.close() for reader in self._readers)
+        )
+
+    def instrument(
+        self,
+        instrumentation: Optional[Instrumentation] = None,
+        *,
+        slow_query_threshold: Optional[float] = None,
+    ) -> Instrumentation:
+        instrumentation = super().instrument(
+            instrumentation, slow_query_threshold=slow_query_threshold
+        )
+        for reader in self._readers:
+            reader.instrument(instrumentation)
+        return instrumentation
+
+    def uninstrument(self):
+        for lane in self._lanes:
+            Connection.uninstrument(lane)
+
+    async def execute_all_lanes(
+        self, sql: str, parameters: Optional[Iterable] = None
+    ) -> list[list]:
+        """Run a statement on the writer and on every reader, i.e. a pragma
+        that configures each connection. Returns the rows from each lane."""
+        if parameters is None:
+            parameters = []
+        return await self._on_all_lanes(Connection._fetchall, sql, parameters)
+
+    async def interrupt(self):
+        for lane in self._lanes:
+            await Connection.interrupt(lane)
+
+    async def create_function(
+        self, name: str, num_params: int, callback: Callable, *, deterministic=False
+    ):
+        await self._on_all_lanes(
+            Connection.create_function,
+            name,
+            num_params,
+            callback,
+            deterministic=deterministic,
+        )
+
+    async def create_aggregate(self, name: str, num_params: int, aggregate_class: type):
+        await self._on_all_lanes(
+            Connection.create_aggregate, name, num_params, aggregate_class
+        )
+
+    async def create_collation(self, name: str, callback: Optional[Callable]):
+        await self._on_all_lanes(Connection.create_collation, name, callback)
+
+    @property
+    def row_factory(self) -> "Optional[type]":
+        return self._conn.row_factory
+
+    @row_factory.setter
+    def row_factory(self, factory: "Optional[type]"):
+        for lane in self._lanes:
+            lane._conn.row_factory = factory
+        self._invalidate_cache()
+
+    @property
+    def text_factory(self) -> type:
+        return self._conn.text_factory
+
+    @text_factory.setter
+    def text_factory(self, factory: type):
+        for lane in self._lanes:
+            lane._conn.text_factory = factory
+        self._invalidate_cache()
+
+    async def enable_load_extension(self, value: bool):
+        await self._on_all_lanes(Connection.enable_load_extension, value)
+
+    async def load_extension(self, path: str):
+        await self._on_all_lanes(Connection.load_extension, path)
+
+    async def set_progress_handler(self, handler: Callable[[], Optional[int]], n: int):
+        await self._on_all_lanes(Connection.set_progress_handler, handler, n)
+
+    async def set_trace_callback(self, handler: Callable):
+        await self._on_all_lanes(Connection.set_trace_callback, handler)
+
+
+def connect_pool(
+    database: Union[str, PathLike], readers: Optional[int] = None, **kwargs
+):
+    return ConnectionPool(database, readers, **kwargs)
@@ -1,5 +1,6 @@
 import pathlib
 
+from .identity import *
 from .methods import *
 from .models import *
 
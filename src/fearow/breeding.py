@@ -0,0 +1,131 @@
+import functools
+import operator
+import typing
+from collections.abc import Iterable
+
+import asqlite3
+
+from .derived import Derived
+from .learnsets import _bits
+
+__all__ = ("BreedingChart",)
+
+DITTO_ID = 132
+UNDISCOVERED_EGG_GROUP_ID = 15
+
+
+class BreedingChart(Derived):
+    """Breeding compatibility of every species, as bitsets over species ids.
+
+    The rules are those of mon_can_mate_with: babies can't breed; a species
+    can breed with itself unless it is Ditto, single-gendered, genderless or
+    in the Undiscovered egg group; anything outside Undiscovered can breed
+    with Ditto; otherwise two species must share an egg group, and can't
+    both be all-male, both all-female, or either be genderless."""
+
+    def __init__(
+        self,
+        gender_rates: dict[int, int],
+        babies: Iterable[int],
+        egg_groups: dict[int, list[int]],
+    ):
+        self.gender_rates = gender_rates
+        self.egg_groups = egg_groups
+        self.species = self._mask(gender_rates)
+        self.babies = self._mask(babies)
+        self.members: dict[int, int] = {}
+        for species_id, group_ids in egg_groups.items():
+            for group_id in group_ids:
+                self.members[group_id] = self.members.get(group_id, 0) | (
+                    1 << species_id
+                )
+        self.undiscovered = self.members.get(UNDISCOVERED_EGG_GROUP_ID, 0)
+        self.by_gender_rate: dict[int, int] = {}
+        for species_id, gender_rate in gender_rates.items():
+            self.by_gender_rate[gender_rate] = self.by_gender_rate.get(
+                gender_rate, 0
+            ) | (1 << species_id)
+        self._mates: dict[int, int] = {}
+
+    @staticmethod
+    def _mask(species_ids: Iterable[int]) -> int:
+        return functools.reduce(
+            operator.or_, (1 << species_id for species_id in species_ids), 0
+        )
+
+    @classmethod
+    async def _build(cls, connection: asqlite3.Connection) -> "BreedingChart":
+        gender_rates: dict[int, int] = {}
+        babies: list[int] = []
+        for species_id, gender_rate, is_baby in await connection.execute_fetchall(
+            "select id, gender_rate, is_baby " "from pokemon_v2_pokemonspecies"
+        ):
+            gender_rates[species_id] = gender_rate
+            if is_baby:
+                babies.append(species_id)
+        egg_groups: dict[int, list[int]] = {}
+        for species_id, egg_group_id in await connection.execute_fetchall(
+            "select pokemon_species_id, egg_group_id "
+            "from pokemon_v2_pokemonegggroup "
+            "order by id"
+        ):
+            egg_groups.setdefault(species_id, []).append(egg_group_id)
+        return cls(gender_rates, babies, egg_groups)
+
+    def _compute_mates(self, species_id: int) -> int:
+        bit = 1 << species_id
+        if not self.species & bit or self.babies & bit:
+            return 0
+        undiscovered = bool(self.undiscovered & bit)
+        ditto = 1 << DITTO_ID
+        if species_id == DITTO_ID:
+            return self.species & ~(self.babies | self.undiscovered | ditto)
+
+        gender_rate = self.gender_rates[species_id]
+        if gender_rate == -1:
+            mates = 0
+        else:
+            mates = functools.reduce(
+                operator.or_,
+                (
+                    self.members.get(group_id, 0)
+                    for group_id in self.egg_groups.get(species_id, ())
+                ),
+                0,
+            )
+            mates &= ~(self.babies | self.by_gender_rate.get(-1, 0))
+            if gender_rate in (0, 8):
+                mates &= ~self.by_gender_rate.get(gender_rate, 0)
+
+        mates &= ~(bit | ditto)
+        if gender_rate not in (0, 8, -1) and not undiscovered:
+            mates |= bit
+        if not undiscovered and self.species & ditto:
+            mates |= ditto
+        return mates
+
+    def mates(self, species_id: int) -> int:
+        """Bitset of the species ids that species_id can breed with."""
+        if (mates := self._mates.get(species_id)) is None:
+            mates = self._mates[species_id] = self._compute_mates(species_id)
+        return mates
+
+    def can_mate(self, species_id: int, mate_id: int) -> bool:
+        return bool(self.mates(species_id) >> mate_id & 1)
+
+    def compatible_mates(self, species_id: int) -> list[int]:
+        return list(_bits(self.mates(species_id)))
+
+    def matrix(
+        self, species_ids: typing.Optional[Iterable[int]] = None
+    ) -> dict[int, list[int]]:
+        """For each species (all of them by default), the ids among the same
+        species that it can breed with."""
+        if species_ids is None:
+            species_ids = self.gender_rates
+        species_ids = list(species_ids)
+        mask = self._mask(species_ids)
+        return {
+            species_id: list(_bits(self.mates(species_id) & mask))
+            for species_id in species_ids
+        }
@@ -0,0 +1,47 @@
+import asyncio
+import typing
+
+import asqlite3
+from asqlite3 import tag_queries
+
+from .models import PokeapiModel
+
+__all__ = ("Derived",)
+
+_D = typing.TypeVar("_D", bound="Derived")
+
+
+class Derived:
+    """Base for read-only structures computed once from the whole database.
+
+    Subclasses implement _build, which runs the queries it needs and returns
+    an instance. load() builds it on first use and shares it afterwards."""
+
+    _instance: typing.Optional["Derived"] = None
+    _lock: asyncio.Lock
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instance = None
+        cls._lock = asyncio.Lock()
+
+    @classmethod
+    async def _build(cls: type[_D], connection: asqlite3.Connection) -> _D:
+        raise NotImplementedError
+
+    @classmethod
+    async def load(cls: type[_D]) -> _D:
+        if cls._instance is None:
+            async with cls._lock:
+                if cls._instance is None:
+                    with tag_queries("{}.load".format(cls.__name__)):
+                        cls._instance = await cls._build(PokeapiModel._connection)
+        return cls._instance
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the instance of this class and of its subclasses, so that
+        the next load() builds it again."""
+        cls._instance = None
+        for subclass in cls.__subclasses__():
+            subclass.invalidate()
@@ -0,0 +1,116 @@
+import typing
+
+import asqlite3
+
+from .derived import Derived
+
+__all__ = ("EvolutionGraph",)
+
+
+class EvolutionGraph(Derived):
+    """The evolution forest over species ids.
+
+    parents maps a species to the species it evolves from (None for the
+    first stage), children the other way round. chains groups species by
+    evolution chain, in id order, and evolutions lists the ids of the
+    pokemon_v2_pokemonevolution rows describing how a species is reached."""
+
+    def __init__(
+        self,
+        chain_ids: dict[int, typing.Optional[int]],
+        parents: dict[int, typing.Optional[int]],
+        evolutions: dict[int, list[int]],
+    ):
+        self.chain_ids = chain_ids
+        self.parents = parents
+        self.evolutions = evolutions
+        self.children: dict[int, list[int]] = {species_id: [] for species_id in parents}
+        self.chains: dict[int, list[int]] = {}
+        for species_id, parent_id in parents.items():
+            if parent_id is not None and parent_id in self.children:
+                self.children[parent_id].append(species_id)
+            if (chain_id := chain_ids[species_id]) is not None:
+                self.chains.setdefault(chain_id, []).append(species_id)
+
+    @classmethod
+    async def _build(cls, connection: asqlite3.Connection) -> "EvolutionGraph":
+        chain_ids: dict[int, typing.Optional[int]] = {}
+        parents: dict[int, typing.Optional[int]] = {}
+        evolutions: dict[int, list[int]] = {}
+        for (
+            species_id,
+            chain_id,
+            parent_id,
+            evolution_id,
+        ) in await connection.execute_fetchall(
+            "select s.id, s.evolution_chain_id, s.evolves_from_species_id, e.id "
+            "from pokemon_v2_pokemonspecies s "
+            "left join pokemon_v2_pokemonevolution e on e.evolved_species_id = s.id "
+            "order by s.id, e.id"
+        ):
+            chain_ids[species_id] = chain_id
+            parents[species_id] = parent_id
+            species_evolutions = evolutions.setdefault(species_id, [])
+            if evolution_id is not None:
+                species_evolutions.append(evolution_id)
+        return cls(chain_ids, parents, evolutions)
+
+    def line(self, species_id: int) -> list[int]:
+        """Every species in the same evolution chain, in id order."""
+        chain_id = self.chain_ids.get(species_id)
+        if chain_id is None:
+            return [species_id]
+        return self.chains[chain_id]
+
+    def same_line(self, species_id: int, other_id: int) -> bool:
+        chain_id = self.chain_ids.get(species_id)
+        if chain_id is None:
+            return species_id == other_id
+        return chain_id == self.chain_ids.get(other_id)
+
+    def is_branching(self, species_id: int) -> bool:
+        """Whether any species in the line evolves in more than one way."""
+        return any(
+            len(self.children.get(member, ())) > 1 for member in self.line(species_id)
+        )
+
+    def ancestors(self, species_id: int) -> list[int]:
+        """species_id followed by each earlier stage, back to the first."""
+        path = [species_id]
+        while (parent_id := self.parents.get(path[-1])) is not None:
+            path.append(parent_id)
+        return path
+
+    def root(self, species_id: int) -> int:
+        return self.ancestors(species_id)[-1]
+
+    def roots(self) -> list[int]:
+        """Every species that does not evolve from another."""
+        return [
+            species_id
+            for species_id, parent_id in self.parents.items()
+            if parent_id is None
+        ]
+
+    def depth(self, species_id: int) -> int:
+        """0 for a first stage, 1 for the species evolving from it, etc."""
+        return len(self.ancestors(species_id)) - 1
+
+    def leaves(self, species_id: typing.Optional[int] = None) -> list[int]:
+        """Final stages of the given species' line, or of every line."""
+        members = self.parents if species_id is None else self.line(species_id)
+        return [member for member in members if not self.children.get(member)]
+
+    def path(self, species_id: int, other_id: int) -> typing.Optional[list[int]]:
+        """Species ids from species_id to other_id through the evolution
+        tree, both included, or None if they are not related."""
+        up = self.ancestors(species_id)
+        positions = {member: i for i, member in enumerate(up)}
+        down = []
+        member: typing.Optional[int] = other_id
+        while member is not None and member not in positions:
+            down.append(member)
+            member = self.parents.get(member)
+        if member is None:
+            return None
+        return up[: positions[member] + 1] + down[::-1]
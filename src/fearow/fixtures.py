@@ -0,0 +1,535 @@
+"""Generate a synthetic database shaped like PokeAPI's.
+
+The tables, columns and foreign keys are the subset of the pokemon_v2
+schema that fearow uses, filled with deterministic random data, so that
+the ORM and benchmarks can run without building the real database:
+
+    python -m fearow.fixtures out.sqlite3 [--species N] [--seed N]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import typing
+
+__all__ = ("TABLES", "create")
+
+# table name (without the pokemon_v2_ prefix) -> [(column, type)]. A column
+# whose type is another table is a foreign key to that table's id.
+TABLES: dict[str, list[tuple[str, str]]] = {
+    "language": [
+        ("iso639", "varchar(10)"),
+        ("iso3166", "varchar(2)"),
+        ("name", "varchar(100)"),
+        ("official", "bool"),
+        ("order", "integer"),
+    ],
+    "languagename": [
+        ("name", "varchar(100)"),
+        ("language_id", "language"),
+        ("local_language_id", "language"),
+    ],
+    "generation": [("name", "varchar(100)")],
+    "versiongroup": [
+        ("name", "varchar(100)"),
+        ("order", "integer"),
+        ("generation_id", "generation"),
+    ],
+    "version": [("name", "varchar(100)"), ("version_group_id", "versiongroup")],
+    "versionname": [
+        ("name", "varchar(100)"),
+        ("language_id", "language"),
+        ("version_id", "version"),
+    ],
+    "type": [("name", "varchar(100)"), ("generation_id", "generation")],
+    "typename": [
+        ("name", "varchar(100)"),
+        ("language_id", "language"),
+        ("type_id", "type"),
+    ],
+    "typeefficacy": [
+        ("damage_factor", "integer"),
+        ("damage_type_id", "type"),
+        ("target_type_id", "type"),
+    ],
+    "stat": [
+        ("name", "varchar(100)"),
+        ("is_battle_only", "bool"),
+        ("game_index", "integer"),
+    ],
+    "statname": [
+        ("name", "varchar(100)"),
+        ("language_id", "language"),
+        ("stat_id", "stat"),
+    ],
+    "egggroup": [("name", "varchar(100)")],
+    "egggroupname": [
+        ("name", "varchar(100)"),
+        ("egg_group_id", "egggroup"),
+        ("language_id", "language"),
+    ],
+    "evolutionchain": [("baby_trigger_item_id", "integer")],
+    "evolutiontrigger": [("name", "varchar(100)")],
+    "pokemonspecies": [
+        ("name", "varchar(100)"),
+        ("order", "integer"),
+        ("gender_rate", "integer"),
+        ("capture_rate", "integer"),
+        ("base_happiness", "integer"),
+        ("is_baby", "bool"),
+        ("is_legendary", "bool"),
+        ("is_mythical", "bool"),
+        ("hatch_counter", "integer"),
+        ("has_gender_differences", "bool"),
+        ("forms_switchable", "bool"),
+        ("evolution_chain_id", "evolutionchain"),
+        ("evolves_from_species_id", "pokemonspecies"),
+        ("generation_id", "generation"),
+    ],
+    "pokemonspeciesname": [
+        ("name", "varchar(100)"),
+        ("genus", "varchar(100)"),
+        ("language_id", "language"),
+        ("pokemon_species_id", "pokemonspecies"),
+    ],
+    "pokemonspeciesflavortext": [
+        ("flavor_text", "text"),
+        ("language_id", "language"),
+        ("pokemon_species_id", "pokemonspecies"),
+        ("version_id", "version"),
+    ],
+    "pokemonevolution": [
+        ("min_level", "integer"),
+        ("evolved_species_id", "pokemonspecies"),
+        ("evolution_trigger_id", "evolutiontrigger"),
+        ("party_species_id", "pokemonspecies"),
+        ("trade_species_id", "pokemonspecies"),
+    ],
+    "pokemonegggroup": [
+        ("egg_group_id", "egggroup"),
+        ("pokemon_species_id", "pokemonspecies"),
+    ],
+    "pokemon": [
+        ("name", "varchar(100)"),
+        ("order", "integer"),
+        ("height", "integer"),
+        ("weight", "integer"),
+        ("base_experience", "integer"),
+        ("is_default", "bool"),
+        ("pokemon_species_id", "pokemonspecies"),
+    ],
+    "pokemontype": [
+        ("slot", "integer"),
+        ("pokemon_id", "pokemon"),
+        ("type_id", "type"),
+    ],
+    "pokemonstat": [
+        ("base_stat", "integer"),
+        ("effort", "integer"),
+        ("pokemon_id", "pokemon"),
+        ("stat_id", "stat"),
+    ],
+    "ability": [
+        ("name", "varchar(100)"),
+        ("is_main_series", "bool"),
+        ("generation_id", "generation"),
+    ],
+    "abilityname": [
+        ("name", "varchar(100)"),
+        ("ability_id", "ability"),
+        ("language_id", "language"),
+    ],
+    "pokemonability": [
+        ("is_hidden", "bool"),
+        ("slot", "integer"),
+        ("ability_id", "ability"),
+        ("pokemon_id", "pokemon"),
+    ],
+    "pokemonform": [
+        ("name", "varchar(100)"),
+        ("form_name", "varchar(100)"),
+        ("order", "integer"),
+        ("is_default", "bool"),
+        ("is_battle_only", "bool"),
+        ("is_mega", "bool"),
+        ("pokemon_id", "pokemon"),
+        ("version_group_id", "versiongroup"),
+    ],
+    "pokemonsprites": [("sprites", "text"), ("pokemon_id", "pokemon")],
+    "move": [
+        ("name", "varchar(100)"),
+        ("power", "integer"),
+        ("pp", "integer"),
+        ("accuracy", "integer"),
+        ("priority", "integer"),
+        ("generation_id", "generation"),
+        ("type_id", "type"),
+    ],
+    "movename": [
+        ("name", "varchar(100)"),
+        ("language_id", "language"),
+        ("move_id", "move"),
+    ],
+    "moveflavortext": [
+        ("flavor_text", "text"),
+        ("language_id", "language"),
+        ("move_id", "move"),
+        ("version_group_id", "versiongroup"),
+    ],
+    "movelearnmethod": [("name", "varchar(100)")],
+    "pokemonmove": [
+        ("order", "integer"),
+        ("level", "integer"),
+        ("move_id", "move"),
+        ("pokemon_id", "pokemon"),
+        ("move_learn_method_id", "movelearnmethod"),
+        ("version_group_id", "versiongroup"),
+    ],
+}
+
+_LANGUAGES = ["ja", "ko", "zh-Hant", "fr", "de", "es", "it", "zh-Hans", "en"]
+_ENGLISH, _GERMAN = 9, 5
+_TYPES = [
+    "Normal", "Fighting", "Flying", "Poison", "Ground", "Rock",
+    "Bug", "Ghost", "Steel", "Fire", "Water", "Grass",
+    "Electric", "Psychic", "Ice", "Dragon", "Dark", "Fairy",
+]  # fmt: skip
+_STATS = ["HP", "Attack", "Defense", "Special Attack", "Special Defense", "Speed"]
+_DITTO_ID = 132
+_UNDISCOVERED_EGG_GROUP_ID = 15
+
+
+def _create_tables(db: sqlite3.Connection, indexes: bool):
+    # The same DDL Django emits for PokeAPI's models, including an index on
+    # every foreign key column unless indexes is false.
+    for table, columns in TABLES.items():
+        defs = ['"id" integer NOT NULL PRIMARY KEY AUTOINCREMENT']
+        for column, coltype in columns:
+            if coltype in TABLES:
+                defs.append(
+                    '"{}" integer NULL REFERENCES "pokemon_v2_{}" ("id") '
+                    "DEFERRABLE INITIALLY DEFERRED".format(column, coltype)
+                )
+            else:
+                defs.append('"{}" {} NULL'.format(column, coltype))
+        db.execute('CREATE TABLE "pokemon_v2_{}" ({})'.format(table, ", ".join(defs)))
+        if indexes:
+            for column, coltype in columns:
+                if coltype in TABLES:
+                    db.execute(
+                        'CREATE INDEX "pokemon_v2_{0}_{1}" '
+                        'ON "pokemon_v2_{0}" ("{1}")'.format(table, column)
+                    )
+
+
+class _Writer:
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+        self.ids: dict[str, int] = {}
+        self.statements = {}
+        for table, columns in TABLES.items():
+            names = ['"id"', *('"{}"'.format(column) for column, _ in columns)]
+            self.statements[table] = (
+                'INSERT INTO "pokemon_v2_{}" ({}) VALUES ({})'.format(
+                    table, ", ".join(names), ", ".join("?" * len(names))
+                )
+            )
+
+    def insert(self, table: str, **values) -> int:
+        id_ = values.pop("id", None) or self.ids.get(table, 0) + 1
+        self.ids[table] = max(id_, self.ids.get(table, 0))
+        row = [id_, *(values.get(column) for column, _ in TABLES[table])]
+        self.db.execute(self.statements[table], row)
+        return id_
+
+    def names(self, table: str, fk: str, id_: int, name: str, **extra):
+        # Localized names in English and German
+        self.insert(table, name=name, language_id=_ENGLISH, **{fk: id_}, **extra)
+        self.insert(
+            table, name=name + " (de)", language_id=_GERMAN, **{fk: id_}, **extra
+        )
+
+
+def create(
+    path: typing.Union[str, os.PathLike],
+    *,
+    species: int = 200,
+    seed: int = 0,
+    indexes: bool = True,
+):
+    """Write a new database to path, which must not exist yet.
+
+    species sets the size: the number of moves and abilities scale with it,
+    and every species gets one or two pokemon with 60 learnable moves each.
+    The same arguments always produce the same rows."""
+    rng = random.Random(seed)
+    db = sqlite3.connect(path)
+    try:
+        _create_tables(db, indexes)
+        _populate(_Writer(db), rng, species)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _populate(w: _Writer, rng: random.Random, n_species: int):
+    for i, iso639 in enumerate(_LANGUAGES, 1):
+        w.insert(
+            "language",
+            id=i,
+            iso639=iso639,
+            iso3166="us",
+            name=iso639,
+            official=True,
+            order=i,
+        )
+    # language_id is the language named, local_language_id the language
+    # the name is written in.
+    for i, iso639 in enumerate(_LANGUAGES, 1):
+        for local, suffix in ((_ENGLISH, ""), (_GERMAN, " (de)")):
+            w.insert(
+                "languagename",
+                name=iso639.upper() + suffix,
+                language_id=i,
+                local_language_id=local,
+            )
+
+    for gen in range(1, 5):
+        w.insert("generation", id=gen, name="generation-{}".format(gen))
+    n_version_groups = 8
+    for vg in range(1, n_version_groups + 1):
+        w.insert(
+            "versiongroup",
+            id=vg,
+            name="version-group-{}".format(vg),
+            order=vg,
+            generation_id=(vg + 1) // 2,
+        )
+        for _ in range(2):
+            version = w.insert(
+                "version",
+                name="version-{}".format(w.ids.get("version", 0) + 1),
+                version_group_id=vg,
+            )
+            w.names("versionname", "version_id", version, "Version {}".format(version))
+
+    for i, name in enumerate(_TYPES, 1):
+        w.insert("type", id=i, name=name.lower(), generation_id=1)
+        w.names("typename", "type_id", i, name)
+    for attacker in range(1, len(_TYPES) + 1):
+        for defender in range(1, len(_TYPES) + 1):
+            w.insert(
+                "typeefficacy",
+                damage_factor=rng.choice([100, 100, 100, 200, 50, 0]),
+                damage_type_id=attacker,
+                target_type_id=defender,
+            )
+    for i, name in enumerate(_STATS, 1):
+        w.insert(
+            "stat",
+            id=i,
+            name=name.lower().replace(" ", "-"),
+            is_battle_only=False,
+            game_index=i,
+        )
+        w.names("statname", "stat_id", i, name)
+    for i in range(1, _UNDISCOVERED_EGG_GROUP_ID + 1):
+        w.insert("egggroup", id=i, name="egg-group-{}".format(i))
+        w.names(
+            "egggroupname",
+            "egg_group_id",
+            i,
+            "No Eggs" if i == _UNDISCOVERED_EGG_GROUP_ID else "Egg Group {}".format(i),
+        )
+    w.insert("evolutiontrigger", id=1, name="level-up")
+    for i in range(1, 4):
+        w.insert("movelearnmethod", id=i, name="method-{}".format(i))
+
+    n_moves = max(20, n_species * 3 // 2)
+    for move in range(1, n_moves + 1):
+        w.insert(
+            "move",
+            id=move,
+            name="move-{}".format(move),
+            power=rng.choice([None, 40, 60, 90]),
+            pp=10,
+            accuracy=100,
+            priority=0,
+            generation_id=1,
+            type_id=rng.randint(1, len(_TYPES)),
+        )
+        w.names("movename", "move_id", move, "Move {}".format(move))
+        for vg in (1, n_version_groups):
+            w.insert(
+                "moveflavortext",
+                flavor_text="Flavor text of move {}.".format(move),
+                language_id=_ENGLISH,
+                move_id=move,
+                version_group_id=vg,
+            )
+    n_abilities = max(10, n_species // 3)
+    for ability in range(1, n_abilities + 1):
+        w.insert(
+            "ability",
+            id=ability,
+            name="ability-{}".format(ability),
+            is_main_series=True,
+            generation_id=1,
+        )
+        w.names("abilityname", "ability_id", ability, "Ability {}".format(ability))
+
+    species_id = 0
+    while species_id < n_species:
+        chain = w.insert("evolutionchain")
+        length = min(rng.choice([1, 2, 3, 3]), n_species - species_id)
+        parent = None
+        for stage in range(length):
+            species_id += 1
+            _add_species(
+                w, rng, species_id, chain, stage, length, parent, n_moves, n_abilities
+            )
+            parent = species_id
+
+
+def _add_species(
+    w: _Writer,
+    rng: random.Random,
+    species_id: int,
+    chain: int,
+    stage: int,
+    length: int,
+    parent: typing.Optional[int],
+    n_moves: int,
+    n_abilities: int,
+):
+    w.insert(
+        "pokemonspecies",
+        id=species_id,
+        name="species-{}".format(species_id),
+        order=species_id,
+        gender_rate=rng.choice([-1, 0, 1, 4, 4, 8]),
+        capture_rate=45,
+        base_happiness=70,
+        is_baby=stage == 0 and length == 3 and rng.random() < 0.2,
+        is_legendary=False,
+        is_mythical=False,
+        hatch_counter=20,
+        has_gender_differences=False,
+        forms_switchable=False,
+        evolution_chain_id=chain,
+        evolves_from_species_id=parent,
+        generation_id=1,
+    )
+    w.names(
+        "pokemonspeciesname",
+        "pokemon_species_id",
+        species_id,
+        "Ditto" if species_id == _DITTO_ID else "Species {}".format(species_id),
+        genus="Synthetic Pokémon",
+    )
+    for version in (1, 2):
+        w.insert(
+            "pokemonspeciesflavortext",
+            flavor_text="Flavor text of species {}.".format(species_id),
+            language_id=_ENGLISH,
+            pokemon_species_id=species_id,
+            version_id=version,
+        )
+    if parent is not None:
+        w.insert(
+            "pokemonevolution",
+            min_level=16 * stage,
+            evolved_species_id=species_id,
+            evolution_trigger_id=1,
+        )
+    egg_groups = range(1, _UNDISCOVERED_EGG_GROUP_ID + 1)
+    for egg_group in rng.sample(egg_groups, rng.choice([1, 2])):
+        w.insert(
+            "pokemonegggroup", egg_group_id=egg_group, pokemon_species_id=species_id
+        )
+
+    for form in range(rng.choice([1, 1, 1, 2])):
+        pokemon = w.ids.get("pokemon", 0) + 1
+        w.insert(
+            "pokemon",
+            id=pokemon,
+            name="pokemon-{}".format(pokemon),
+            order=pokemon,
+            height=10,
+            weight=100,
+            base_experience=64,
+            is_default=form == 0,
+            pokemon_species_id=species_id,
+        )
+        types = rng.sample(range(1, len(_TYPES) + 1), rng.choice([1, 2]))
+        for slot, type_id in enumerate(types, 1):
+            w.insert("pokemontype", slot=slot, pokemon_id=pokemon, type_id=type_id)
+        for stat in range(1, len(_STATS) + 1):
+            w.insert(
+                "pokemonstat",
+                base_stat=rng.randint(20, 150),
+                effort=0,
+                pokemon_id=pokemon,
+                stat_id=stat,
+            )
+        for slot in (1, 2, 3):
+            w.insert(
+                "pokemonability",
+                is_hidden=slot == 3,
+                slot=slot,
+                ability_id=rng.randint(1, n_abilities),
+                pokemon_id=pokemon,
+            )
+        w.insert(
+            "pokemonform",
+            name="pokemon-{}".format(pokemon),
+            form_name="",
+            order=pokemon,
+            is_default=True,
+            is_battle_only=False,
+            is_mega=form == 1 and rng.random() < 0.5,
+            pokemon_id=pokemon,
+            version_group_id=1,
+        )
+        w.insert(
+            "pokemonsprites",
+            sprites=json.dumps(
+                {"front_default": "/media/sprites/{}.png".format(pokemon)}
+            ),
+            pokemon_id=pokemon,
+        )
+        for vg in rng.sample(range(1, 9), 4):
+            for move in rng.sample(range(1, n_moves + 1), min(n_moves, 15)):
+                w.insert(
+                    "pokemonmove",
+                    order=0,
+                    level=rng.randint(1, 60),
+                    move_id=move,
+                    pokemon_id=pokemon,
+                    move_learn_method_id=rng.randint(1, 3),
+                    version_group_id=vg,
+                )
+
+
+def main(argv: typing.Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m fearow.fixtures",
+        description="Generate a synthetic PokeAPI-shaped database.",
+    )
+    parser.add_argument("path")
+    parser.add_argument("--species", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-indexes",
+        dest="indexes",
+        action="store_false",
+        help="leave the foreign key columns unindexed",
+    )
+    args = parser.parse_args(argv)
+    create(args.path, species=args.species, seed=args.seed, indexes=args.indexes)
+
+
+if __name__ == "__main__":
+    main()
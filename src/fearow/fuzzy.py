@@ -0,0 +1,87 @@
+import collections
+import difflib
+import re
+import typing
+from collections.abc import Iterable
+
+__all__ = ("NameIndex",)
+
+_garbage_pat = re.compile(r'[. \t-\'"]')
+
+
+def _isjunk(s: str) -> bool:
+    return _garbage_pat.match(s) is not None
+
+
+def _normalize(name: str) -> str:
+    return _garbage_pat.sub("", name.casefold())
+
+
+class NameIndex:
+    """In-memory fuzzy index from names to row ids.
+
+    Lookups first try an exact match, ignoring case and punctuation. Failing
+    that, names sharing the most character n-grams with the query are scored
+    with the same SequenceMatcher ratio that FUZZY_RATIO uses, skipping any
+    whose length alone rules them out."""
+
+    def __init__(
+        self,
+        entries: Iterable[tuple[int, str]],
+        *,
+        ngram: int = 3,
+        max_candidates: int = 64,
+    ):
+        self.ngram = ngram
+        self.max_candidates = max_candidates
+        self._entries: list[tuple[int, str]] = []
+        self._exact: dict[str, list[int]] = {}
+        self._grams: dict[str, list[int]] = collections.defaultdict(list)
+        for id_, name in entries:
+            if not name:
+                continue
+            folded = name.casefold()
+            idx = len(self._entries)
+            self._entries.append((id_, folded))
+            self._exact.setdefault(_normalize(name), []).append(id_)
+            for gram in self._ngrams(folded):
+                self._grams[gram].append(idx)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ngrams(self, folded: str) -> set[str]:
+        padded = " " * (self.ngram - 1) + folded + " "
+        return {padded[i : i + self.ngram] for i in range(len(padded) - self.ngram + 1)}
+
+    def _candidates(self, folded: str) -> list[int]:
+        counts = collections.Counter()
+        for gram in self._ngrams(folded):
+            counts.update(self._grams.get(gram, ()))
+        return [idx for idx, _ in counts.most_common(self.max_candidates)]
+
+    def search(
+        self, name: str, *, cutoff: float = 0.9, limit: typing.Optional[int] = 1
+    ) -> list[tuple[int, float]]:
+        """Return up to limit (id, score) pairs scoring above cutoff, best
+        first. Exact matches score 1.0 and are always returned."""
+        results: dict[int, float] = dict.fromkeys(
+            self._exact.get(_normalize(name), ()), 1.0
+        )
+        if limit is None or len(results) < limit:
+            folded = name.casefold()
+            matcher = difflib.SequenceMatcher(_isjunk)
+            matcher.set_seq2(folded)
+            for idx in self._candidates(folded):
+                id_, candidate = self._entries[idx]
+                if results.get(id_, 0.0) >= 1.0:
+                    continue
+                matcher.set_seq1(candidate)
+                if (
+                    matcher.real_quick_ratio() > cutoff
+                    and matcher.quick_ratio() > cutoff
+                    and (score := matcher.ratio()) > cutoff
+                ):
+                    results[id_] = max(score, results.get(id_, 0.0))
+        ranked = sorted(results.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
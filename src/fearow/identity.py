@@ -0,0 +1,162 @@
+import collections
+import functools
+import typing
+import weakref
+
+__all__ = (
+    "IdentityMapStats",
+    "IdentityMap",
+    "LRUIdentityMap",
+    "WeakIdentityMap",
+    "PerClassIdentityMap",
+)
+
+_Key = tuple[type, int]
+
+
+class IdentityMapStats(typing.NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class IdentityMap:
+    """Maps (model class, id) to the one live instance for that row.
+
+    The base class keeps every instance for the life of the process. The
+    subclasses trade memory for latency by forgetting instances, which are
+    then loaded again from the database on the next lookup."""
+
+    def __init__(self):
+        self._data: dict[_Key, typing.Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key: _Key):
+        return self._data.get(key)
+
+    def get(self, key: _Key, default=None):
+        obj = self._lookup(key)
+        if obj is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return obj
+
+    def __contains__(self, key: _Key) -> bool:
+        return self._lookup(key) is not None
+
+    def __setitem__(self, key: _Key, obj):
+        self._data[key] = obj
+
+    def __delitem__(self, key: _Key):
+        del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> IdentityMapStats:
+        return IdentityMapStats(self.hits, self.misses, self.evictions, len(self))
+
+    def __repr__(self):
+        return "<{0.__class__.__name__} {1}>".format(self, self.stats())
+
+
+class LRUIdentityMap(IdentityMap):
+    """Keeps at most maxsize instances, forgetting the least recently used."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+        self._data: collections.OrderedDict[_Key, typing.Any] = (
+            collections.OrderedDict()
+        )
+
+    def _lookup(self, key: _Key):
+        obj = self._data.get(key)
+        if obj is not None:
+            self._data.move_to_end(key)
+        return obj
+
+    def __setitem__(self, key: _Key, obj):
+        self._data[key] = obj
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+class WeakIdentityMap(IdentityMap):
+    """Keeps instances only for as long as something else references them."""
+
+    def __init__(self):
+        super().__init__()
+        self._data: dict[_Key, weakref.ref] = {}
+
+    def _expire(self, key: _Key, ref: weakref.ref):
+        if self._data.get(key) is ref:
+            del self._data[key]
+            self.evictions += 1
+
+    def _lookup(self, key: _Key):
+        ref = self._data.get(key)
+        return ref() if ref is not None else None
+
+    def __setitem__(self, key: _Key, obj):
+        self._data[key] = weakref.ref(obj, functools.partial(self._expire, key))
+
+
+class PerClassIdentityMap(IdentityMap):
+    """Gives each model class its own LRU budget.
+
+    budgets maps class names, i.e. "PokemonMove", to the number of instances
+    of that class to keep. Classes not listed get the default budget, or are
+    kept without bound if the default is None."""
+
+    def __init__(self, budgets: dict[str, int], default: typing.Optional[int] = None):
+        super().__init__()
+        self.budgets = budgets
+        self.default = default
+        self._maps: dict[type, IdentityMap] = {}
+
+    def _map_for(self, cls: type) -> IdentityMap:
+        if (map_ := self._maps.get(cls)) is None:
+            budget = self.budgets.get(cls.__name__, self.default)
+            map_ = IdentityMap() if budget is None else LRUIdentityMap(budget)
+            self._maps[cls] = map_
+        return map_
+
+    def _lookup(self, key: _Key):
+        return self._map_for(key[0])._lookup(key)
+
+    def __setitem__(self, key: _Key, obj):
+        self._map_for(key[0])[key] = obj
+
+    def __delitem__(self, key: _Key):
+        del self._map_for(key[0])[key]
+
+    def __len__(self) -> int:
+        return sum(map(len, self._maps.values()))
+
+    def clear(self):
+        self._maps.clear()
+
+    def get(self, key: _Key, default=None):
+        obj = self._map_for(key[0]).get(key)
+        if obj is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return obj
+
+    def stats(self) -> IdentityMapStats:
+        evictions = sum(map_.evictions for map_ in self._maps.values())
+        return IdentityMapStats(self.hits, self.misses, evictions, len(self))
+
+    def stats_by_class(self) -> dict[str, IdentityMapStats]:
+        return {cls.__name__: map_.stats() for cls, map_ in self._maps.items()}
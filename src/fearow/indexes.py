@@ -0,0 +1,177 @@
+"""Check the query plans of the statements the ORM generates.
+
+Run as a script to report every generated statement that SQLite answers
+with a full table scan, and optionally create the missing indexes:
+
+    python -m fearow.indexes [database] [--create | --sidecar FILE]
+"""
+
+import argparse
+import asyncio
+import os
+import typing
+from collections.abc import Iterable
+
+import asqlite3
+
+from .models import PokeapiModel
+
+__all__ = (
+    "Probe",
+    "ScanReport",
+    "probes",
+    "audit",
+    "index_ddl",
+    "create_indexes",
+    "write_sidecar",
+)
+
+
+class Probe(typing.NamedTuple):
+    source: str
+    table: str
+    columns: tuple[str, ...]
+    statement: str
+
+
+class ScanReport(typing.NamedTuple):
+    probe: Probe
+    plan: list[str]
+
+
+def probes(classes=None) -> list[Probe]:
+    """Return the lookups issued by get, relationships, backrefs and
+    load_names, one per distinct table and column list."""
+    if classes is None:
+        classes = PokeapiModel.classes
+    found: dict[tuple[str, tuple[str, ...]], Probe] = {}
+
+    def add(source: str, table: str, columns: tuple[str, ...], statement: str):
+        found.setdefault((table, columns), Probe(source, table, columns, statement))
+
+    for name, cls in vars(classes).items():
+        if name.startswith("__"):
+            continue
+        add(
+            "{}.get".format(name),
+            cls.__tablename__,
+            ("id",),
+            "select * " "from {} " "where id = ?".format(cls.__tablename__),
+        )
+        for attrname, rel in cls.__relationships__.items():
+            add(
+                "{}.{}".format(name, attrname),
+                rel.target,
+                (rel.foreign_col,),
+                "select * "
+                'from "{}" '
+                "where {} = ?".format(rel.target, rel.foreign_col),
+            )
+        if (source := cls._name_source()) is not None:
+            tbl_name, fk_name, lang_attr_name = source
+            # Covering, so that the names are read from the index alone.
+            add(
+                "{}.load_names".format(name),
+                tbl_name,
+                (lang_attr_name, fk_name, "name"),
+                "select {1}, name "
+                'from "{0}" '
+                "where {2} = ?".format(tbl_name, fk_name, lang_attr_name),
+            )
+    return list(found.values())
+
+
+async def audit(
+    connection: typing.Optional[asqlite3.Connection] = None,
+    probe_list: typing.Optional[Iterable[Probe]] = None,
+) -> list[ScanReport]:
+    """Run EXPLAIN QUERY PLAN on each probe and return those whose plan
+    scans a table instead of searching it."""
+    if connection is None:
+        connection = PokeapiModel._connection
+    if probe_list is None:
+        probe_list = probes()
+    reports = []
+    for probe in probe_list:
+        rows = await connection.execute_fetchall(
+            "explain query plan " + probe.statement,
+            (None,) * probe.statement.count("?"),
+        )
+        plan = [detail for *_, detail in rows]
+        if any(detail.startswith("SCAN") for detail in plan):
+            reports.append(ScanReport(probe, plan))
+    return reports
+
+
+def index_ddl(reports: Iterable[ScanReport]) -> list[str]:
+    return [
+        'create index if not exists "ix_fearow_{0}_{1}" on "{0}" ({2})'.format(
+            report.probe.table,
+            "_".join(report.probe.columns),
+            ", ".join('"{}"'.format(column) for column in report.probe.columns),
+        )
+        for report in reports
+    ]
+
+
+async def create_indexes(
+    connection: asqlite3.Connection, reports: Iterable[ScanReport]
+) -> list[str]:
+    """Create the indexes missing for the given reports in the database
+    itself, which must be writable, and return the statements run."""
+    statements = index_ddl(reports)
+    for statement in statements:
+        await connection.execute_fetchall(statement)
+    await connection.commit()
+    return statements
+
+
+def write_sidecar(path: typing.Union[str, os.PathLike], reports: Iterable[ScanReport]):
+    """Write the missing indexes as a SQL script, to be applied to the
+    database later, i.e. with Connection.executescript."""
+    with open(path, "w") as fp:
+        for statement in index_ddl(reports):
+            fp.write(statement + ";\n")
+
+
+async def _main(args: argparse.Namespace):
+    from .methods import connect
+
+    db = await connect(args.database)
+    try:
+        reports = await audit(db)
+        for report in reports:
+            print("{} ({})".format(report.probe.source, report.probe.statement))
+            for detail in report.plan:
+                print("    " + detail)
+        print("{} of {} lookups scan a table".format(len(reports), len(probes())))
+        if args.create and reports:
+            for statement in await create_indexes(db, reports):
+                print(statement)
+        elif args.sidecar and reports:
+            write_sidecar(args.sidecar, reports)
+            print("Wrote {}".format(args.sidecar))
+    finally:
+        await db.close()
+
+
+def main(argv: typing.Optional[list[str]] = None):
+    from .methods import dbfile
+
+    parser = argparse.ArgumentParser(
+        prog="python -m fearow.indexes",
+        description="Report ORM lookups that scan a table.",
+    )
+    parser.add_argument("database", nargs="?", default=str(dbfile))
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--create", action="store_true", help="create the missing indexes"
+    )
+    group.add_argument(
+        "--sidecar", metavar="FILE", help="write the missing indexes to a SQL file"
+    )
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import functools
+import operator
+import typing
+from collections.abc import Iterator
+
+import asqlite3
+
+from .derived import Derived
+
+__all__ = ("LearnsetIndex",)
+
+
+def _bits(n: int) -> Iterator[int]:
+    while n:
+        low = n & -n
+        yield low.bit_length() - 1
+        n ^= low
+
+
+class LearnsetIndex(Derived):
+    """Moves learned by each species' default form, as bitsets.
+
+    by_version_group[species_id][version_group_id] has bit move_id set for
+    every move that species can learn in that version group, by any method;
+    combined[species_id] is the union over all version groups."""
+
+    def __init__(self, by_version_group: dict[int, dict[int, int]]):
+        self.by_version_group = by_version_group
+        self.combined = {
+            species_id: functools.reduce(operator.or_, learnsets.values(), 0)
+            for species_id, learnsets in by_version_group.items()
+        }
+        self._species = functools.reduce(
+            operator.or_, (1 << species_id for species_id in by_version_group), 0
+        )
+        self._learners: dict[typing.Optional[int], dict[int, int]] = {}
+
+    @classmethod
+    async def _build(cls, connection: asqlite3.Connection) -> "LearnsetIndex":
+        default_pokemon: dict[int, int] = {}
+        for species_id, pokemon_id in await connection.execute_fetchall(
+            "select pokemon_species_id, id "
+            "from pokemon_v2_pokemon "
+            "where is_default "
+            "order by id"
+        ):
+            default_pokemon.setdefault(species_id, pokemon_id)
+        species_of = {
+            pokemon_id: species_id for species_id, pokemon_id in default_pokemon.items()
+        }
+        by_version_group: dict[int, dict[int, int]] = {}
+        async with connection.execute(
+            "select pokemon_id, version_group_id, move_id "
+            "from pokemon_v2_pokemonmove"
+        ) as cursor:
+            async for rows in cursor.chunks():
+                for pokemon_id, version_group_id, move_id in rows:
+                    if (species_id := species_of.get(pokemon_id)) is None:
+                        continue
+                    learnsets = by_version_group.setdefault(species_id, {})
+                    learnsets[version_group_id] = learnsets.get(version_group_id, 0) | (
+                        1 << move_id
+                    )
+        return cls(by_version_group)
+
+    def moves(
+        self, species_id: int, version_group_id: typing.Optional[int] = None
+    ) -> int:
+        if version_group_id is None:
+            return self.combined.get(species_id, 0)
+        return self.by_version_group.get(species_id, {}).get(version_group_id, 0)
+
+    def move_ids(
+        self, species_id: int, version_group_id: typing.Optional[int] = None
+    ) -> list[int]:
+        return list(_bits(self.moves(species_id, version_group_id)))
+
+    def can_learn(
+        self,
+        species_id: int,
+        move_id: int,
+        version_group_id: typing.Optional[int] = None,
+    ) -> bool:
+        return bool(self.moves(species_id, version_group_id) >> move_id & 1)
+
+    def learners(self, version_group_id: typing.Optional[int] = None) -> dict[int, int]:
+        """Move id -> bitset of the species ids that learn it."""
+        if (learners := self._learners.get(version_group_id)) is None:
+            learners = self._learners[version_group_id] = {}
+            for species_id in self.by_version_group:
+                for move_id in _bits(self.moves(species_id, version_group_id)):
+                    learners[move_id] = learners.get(move_id, 0) | (1 << species_id)
+        return learners
+
+    def species_learning(
+        self, *move_ids: int, version_group_id: typing.Optional[int] = None
+    ) -> list[int]:
+        """Ids of the species that learn every one of the given moves."""
+        learners = self.learners(version_group_id)
+        species = functools.reduce(
+            operator.and_,
+            (learners.get(move_id, 0) for move_id in move_ids),
+            self._species,
+        )
+        return list(_bits(species))
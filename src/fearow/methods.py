@@ -5,17 +5,182 @@ import pathlib
 import random
 import re
 import typing
+import urllib.parse
+import warnings
+from collections.abc import Iterable
 
 import asqlite3
 
+from .breeding import BreedingChart
+from .derived import Derived
+from .evolution import EvolutionGraph
+from .identity import IdentityMap
+from .learnsets import LearnsetIndex
 from .models import PokeapiModel, collection
+from .typechart import TypeChart
 
 dbfile = pathlib.Path(__file__).parent / "db.sqlite3"
 
 
-async def connect(filename: str | os.PathLike = dbfile):
-    db = await asqlite3.connect(filename, uri=True)
-    await PokeapiModel.prepare(db)
+# Upper bounds; SQLite maps no more than the file and may cap mmap_size lower.
+_MMAP_SIZE = 1 << 30
+# Negative cache sizes are in KiB: 64 MiB of page cache per connection.
+_MMAP_CACHE_SIZE = -(1 << 16)
+
+
+def _database_uri(filename: typing.Union[str, os.PathLike], **params) -> str:
+    filename = os.fspath(filename)
+    if filename.startswith("file:"):
+        parts = urllib.parse.urlsplit(filename)
+        query = urllib.parse.parse_qsl(parts.query) + list(params.items())
+        return urllib.parse.urlunsplit(
+            parts._replace(query=urllib.parse.urlencode(query))
+        )
+    uri = pathlib.Path(filename).absolute().as_uri()
+    return uri + "?" + urllib.parse.urlencode(params) if params else uri
+
+
+async def _open_database(
+    filename: typing.Union[str, os.PathLike],
+    *,
+    readers: int,
+    storage: str,
+    inline: bool = False,
+) -> asqlite3.Connection:
+    open_connection = asqlite3.connect_inline if inline else asqlite3.connect
+    if inline and readers:
+        raise ValueError("readers need an event loop")
+    if storage == "memory":
+        if readers:
+            raise ValueError("an in-memory copy cannot be shared between readers")
+        db = await open_connection(":memory:")
+        async with open_connection(
+            _database_uri(filename, mode="ro"), uri=True
+        ) as source:
+            await source.backup(db)
+        return db
+    if storage == "mmap":
+        # The database never changes, so skip locking and change detection,
+        # and read pages straight out of a memory map of the whole file.
+        filename = _database_uri(filename, immutable=1)
+    elif storage != "file":
+        raise ValueError("unknown storage mode {!r}".format(storage))
+    if readers:
+        db = await asqlite3.connect_pool(filename, readers=readers, uri=True)
+    else:
+        db = await open_connection(filename, uri=True)
+    if storage == "mmap":
+        for pragma in (
+            "pragma mmap_size = {}".format(_MMAP_SIZE),
+            "pragma cache_size = {}".format(_MMAP_CACHE_SIZE),
+        ):
+            if readers:
+                await db.execute_all_lanes(pragma)
+            else:
+                await db.execute_fetchall(pragma)
+    return db
+
+
+async def connect(
+    filename: str | os.PathLike = dbfile,
+    *,
+    storage: str = "file",
+    readers: int = 0,
+    identity_map: typing.Optional[IdentityMap] = None,
+    schema_snapshot: typing.Union[str, os.PathLike, bool] = False,
+    compact: bool = False,
+    language: typing.Union[int, str] = 9,
+    preload_names: bool = False,
+    audit_indexes: bool = False,
+    result_cache: typing.Union[bool, asqlite3.ResultCache] = False,
+    materialize: bool = False,
+):
+    """Open the PokeAPI database and prepare the model classes.
+
+    storage chooses how the database is read. "file" (the default) opens it
+    normally. "memory" copies the whole database into an in-memory
+    connection with Connection.backup; the schema snapshot is then unused,
+    and readers must be 0. "mmap" opens the file as immutable, with a
+    memory map covering it and a larger page cache on every connection.
+
+    If readers is nonzero, read-only queries are spread across that many
+    worker threads, each with its own read-only connection.
+
+    identity_map replaces the default unbounded map of loaded rows, i.e.
+    with an LRUIdentityMap, WeakIdentityMap or PerClassIdentityMap.
+
+    schema_snapshot, if a path, caches the class layout built from the
+    database schema in that file, or if True in a file next to the database,
+    which must then be writable. By default the schema is introspected.
+
+    compact stores each row's columns in __slots__ instead of a __dict__, to
+    save memory when many rows are loaded.
+
+    language selects the language of qualified_name and name lookups, by id
+    or ISO 639 code. Names are loaded one table at a time as they are first
+    needed, or for every table right away if preload_names is true.
+
+    If audit_indexes is true, a warning lists the lookups generated by the
+    ORM that the database answers with a full table scan; see
+    fearow.indexes to create the missing indexes.
+
+    result_cache, if true or an asqlite3.ResultCache, serves repeated
+    read-only statements from memory until the database changes.
+
+    If materialize is true, every row is loaded up front and relationships
+    become plain attributes; see PokeapiModel.materialize.
+
+    See fearow.sync for a synchronous version."""
+    db = await _open_database(filename, readers=readers, storage=storage)
+    return await _setup(
+        db,
+        identity_map=identity_map,
+        schema_snapshot=schema_snapshot,
+        compact=compact,
+        language=language,
+        preload_names=preload_names,
+        audit_indexes=audit_indexes,
+        result_cache=result_cache,
+        materialize=materialize,
+    )
+
+
+async def _setup(
+    db: asqlite3.Connection,
+    *,
+    identity_map: typing.Optional[IdentityMap] = None,
+    schema_snapshot: typing.Union[str, os.PathLike, bool] = False,
+    compact: bool = False,
+    language: typing.Union[int, str] = 9,
+    preload_names: bool = False,
+    audit_indexes: bool = False,
+    result_cache: typing.Union[bool, asqlite3.ResultCache] = False,
+    materialize: bool = False,
+) -> asqlite3.Connection:
+    # Prepare the models on a newly opened database; the rest of connect.
+    Derived.invalidate()
+    if result_cache:
+        db.enable_result_cache(None if result_cache is True else result_cache)
+    await PokeapiModel.prepare(
+        db,
+        identity_map=identity_map,
+        schema_snapshot=schema_snapshot,
+        compact=compact,
+    )
+    await PokeapiModel.set_language(language)
+    if preload_names:
+        await PokeapiModel.load_all_names()
+    if materialize:
+        await PokeapiModel.materialize()
+    if audit_indexes:
+        from .indexes import audit
+
+        if reports := await audit(db):
+            warnings.warn(
+                "{} ORM lookups scan a table: {}".format(
+                    len(reports), ", ".join(report.probe.source for report in reports)
+                )
+            )
     db.__dict__.update(
         {
             key: value
@@ -43,8 +208,28 @@ async def get_species(id_: int) -> "PokeapiModel.classes.PokemonSpecies":
     return await PokeapiModel.classes.PokemonSpecies.get(id_)
 
 
-async def random_pokemon() -> "PokeapiModel.classes.PokemonSpecies":
-    return await PokeapiModel.classes.PokemonSpecies.get_random()
+# Species that nothing else evolves from
+_fully_evolved = (
+    "id not in (select evolves_from_species_id "
+    "from pokemon_v2_pokemonspecies "
+    "where evolves_from_species_id is not null)"
+)
+
+
+async def random_pokemon(
+    *, fully_evolved=False
+) -> "PokeapiModel.classes.PokemonSpecies":
+    return await PokeapiModel.classes.PokemonSpecies.get_random(
+        where=_fully_evolved if fully_evolved else None
+    )
+
+
+async def random_pokemon_many(
+    n: int, *, unique=True, fully_evolved=False
+) -> list["PokeapiModel.classes.PokemonSpecies"]:
+    return await PokeapiModel.classes.PokemonSpecies.get_random_many(
+        n, unique=unique, where=_fully_evolved if fully_evolved else None
+    )
 
 
 async def get_default_pokemon(mon: "PokeapiModel.classes.PokemonSpecies"):
@@ -97,48 +282,67 @@ async def get_mon_types(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> list["PokeapiModel.classes.Type"]:
     default_mon = await get_default_pokemon(mon)
-    return [await ptype.type for ptype in await default_mon.pokemon_types]
+    pokemon_types = await (await default_mon.pokemon_types).prefetch("type")
+    return [await ptype.type for ptype in pokemon_types]
+
+
+async def get_type_chart() -> TypeChart:
+    return await TypeChart.load()
 
 
 async def get_mon_matchup_against_type(
     mon: "PokeapiModel.classes.PokemonSpecies", type_: "PokeapiModel.classes.Type"
 ) -> float:
-    start = 1.0
-    default_mon = await get_default_pokemon(mon)
-    for ptyp in await default_mon.pokemon_types:
-        typ = await ptyp.type
-        for efficacy in await typ.type_efficacys__target_type:
-            if await efficacy.damage_type == type_:
-                start *= efficacy.damage_factor / 100.0
-    return start
+    return (await get_type_chart()).matchup(mon.id, type_.id)
 
 
 async def get_mon_matchup_against_move(
     mon: "PokeapiModel.classes.PokemonSpecies", move: "PokeapiModel.classes.Type"
 ) -> float:
-    types = [await move.type]
+    chart = await get_type_chart()
+    types = [move.type_id]
     if move.id == 560:
-        types.append(await PokeapiModel.classes.Type.get(3))
-    return math.prod(
-        [await get_mon_matchup_against_type(mon, type_) for type_ in types]
-    )
+        types.append(3)
+    return math.prod([chart.matchup(mon.id, type_id) for type_id in types])
 
 
 async def get_mon_matchup_against_mon(
     mon: "PokeapiModel.classes.PokemonSpecies",
     mon2: "PokeapiModel.classes.PokemonSpecies",
 ) -> list[float]:
-    return [
-        await get_mon_matchup_against_type(mon, type_)
-        for type_ in await get_mon_types(mon2)
-    ]
+    return (await get_type_chart()).matchup_against_species(mon.id, mon2.id)
+
+
+async def get_matchups_against_types(
+    mons: typing.Optional[Iterable["PokeapiModel.classes.PokemonSpecies"]] = None,
+) -> dict[int, list[float]]:
+    """Species id -> multiplier of every attacking type, in the order of
+    get_type_chart().type_ids. Covers every species if mons is None."""
+    chart = await get_type_chart()
+    return chart.species_by_type(None if mons is None else [mon.id for mon in mons])
+
+
+async def get_matchups_against_mons(
+    mons: typing.Optional[Iterable["PokeapiModel.classes.PokemonSpecies"]] = None,
+) -> dict[int, dict[int, list[float]]]:
+    """Defending species id -> attacking species id -> the result of
+    get_mon_matchup_against_mon. Covers every species if mons is None."""
+    chart = await get_type_chart()
+    return chart.species_by_species(None if mons is None else [mon.id for mon in mons])
+
+
+async def get_learnset_index() -> LearnsetIndex:
+    return await LearnsetIndex.load()
 
 
 async def get_mon_learnset(
     mon: "PokeapiModel.classes.PokemonSpecies",
+    *,
+    version_group: typing.Optional["PokeapiModel.classes.VersionGroup"] = None,
 ) -> set["PokeapiModel.classes.Move"]:
-    default_pokemon = await get_default_pokemon(mon)
-    return set(await pm.move for pm in await default_pokemon.pokemon_moves)
+    index = await get_learnset_index()
+    move_ids = index.move_ids(mon.id, version_group and version_group.id)
+    return set(await PokeapiModel.classes.Move.get_many(move_ids))
 
 
 async def get_mon_learnset_with_flags(
@@ -149,10 +353,27 @@ async def get_mon_learnset_with_flags(
 
 
 async def mon_can_learn_move(
-    mon: "PokeapiModel.classes.PokemonSpecies", move: "PokeapiModel.classes.Move"
-):
-    default_mon = await get_default_pokemon(mon)
-    return await (await default_mon.pokemon_moves).get(move=move) is not None
+    mon: "PokeapiModel.classes.PokemonSpecies",
+    move: "PokeapiModel.classes.Move",
+    *,
+    version_group: typing.Optional["PokeapiModel.classes.VersionGroup"] = None,
+) -> bool:
+    index = await get_learnset_index()
+    return index.can_learn(mon.id, move.id, version_group and version_group.id)
+
+
+async def get_mons_that_learn(
+    *moves: "PokeapiModel.classes.Move",
+    version_group: typing.Optional["PokeapiModel.classes.VersionGroup"] = None,
+) -> list["PokeapiModel.classes.PokemonSpecies"]:
+    """Species whose default form learns every one of the given moves, in
+    the given version group or in any of them."""
+    index = await get_learnset_index()
+    species_ids = index.species_learning(
+        *(move.id for move in moves),
+        version_group_id=version_group and version_group.id,
+    )
+    return await PokeapiModel.classes.PokemonSpecies.get_many(species_ids)
 
 
 async def get_mon_abilities_with_flags(
@@ -166,6 +387,7 @@ async def get_mon_abilities(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> list["PokeapiModel.classes.Ability"]:
     pokemon_abilities = await get_mon_abilities_with_flags(mon)
+    await pokemon_abilities.prefetch("ability")
     return [await pab.ability for pab in pokemon_abilities]
 
 
@@ -185,33 +407,67 @@ async def mon_has_type(
 
 
 async def has_mega_evolution(mon: "PokeapiModel.classes.PokemonSpecies") -> bool:
-    for poke in await mon.pokemons:
+    for poke in await (await mon.pokemons).prefetch("pokemon_forms"):
         if await (await poke.pokemon_forms).get(is_mega=True) is not None:
             return True
     return False
 
 
+async def get_evolution_graph() -> EvolutionGraph:
+    return await EvolutionGraph.load()
+
+
 async def get_evo_line(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> collection["PokeapiModel.classes.PokemonSpecies"]:
-    return await (await mon.evolution_chain).pokemon_species
+    graph = await get_evolution_graph()
+    return collection(
+        await PokeapiModel.classes.PokemonSpecies.get_many(graph.line(mon.id))
+    )
 
 
 async def has_evos(mon: "PokeapiModel.classes.PokemonSpecies") -> bool:
-    return len(await get_evo_line(mon)) > 1
+    return len((await get_evolution_graph()).line(mon.id)) > 1
 
 
 async def is_in_evo_line(
     needle: "PokeapiModel.classes.PokemonSpecies",
     haystack: "PokeapiModel.classes.PokemonSpecies",
 ) -> bool:
-    return needle in await get_evo_line(haystack)
+    return (await get_evolution_graph()).same_line(needle.id, haystack.id)
 
 
 async def has_branching_evos(mon: "PokeapiModel.classes.PokemonSpecies") -> bool:
-    return any(
-        [len(await poke.evolves_into_species) > 1 for poke in await get_evo_line(mon)]
-    )
+    return (await get_evolution_graph()).is_branching(mon.id)
+
+
+async def get_evo_root(
+    mon: "PokeapiModel.classes.PokemonSpecies",
+) -> "PokeapiModel.classes.PokemonSpecies":
+    return await get_species((await get_evolution_graph()).root(mon.id))
+
+
+async def get_evo_leaves(
+    mon: "PokeapiModel.classes.PokemonSpecies",
+) -> list["PokeapiModel.classes.PokemonSpecies"]:
+    graph = await get_evolution_graph()
+    return await PokeapiModel.classes.PokemonSpecies.get_many(graph.leaves(mon.id))
+
+
+async def get_evo_depth(mon: "PokeapiModel.classes.PokemonSpecies") -> int:
+    return (await get_evolution_graph()).depth(mon.id)
+
+
+async def get_evo_path(
+    mon: "PokeapiModel.classes.PokemonSpecies",
+    mon2: "PokeapiModel.classes.PokemonSpecies",
+) -> typing.Optional[list["PokeapiModel.classes.PokemonSpecies"]]:
+    """The species from mon to mon2 through their evolution tree, or None if
+    they are not related."""
+    path = (await get_evolution_graph()).path(mon.id, mon2.id)
+    if path is None:
+        return None
+    return await PokeapiModel.classes.PokemonSpecies.get_many(path)
 
 
 async def mon_is_in_dex(
@@ -223,23 +479,115 @@ async def mon_is_in_dex(
 async def get_default_forme(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> "PokeapiModel.classes.PokemonForm":
-    for poke in await mon.pokemons:
+    for poke in await (await mon.pokemons).prefetch("pokemon_forms"):
         if form := await (await poke.pokemon_forms).get(is_default=True):
             return form
 
 
 async def get_base_stats(mon: "PokeapiModel.classes.PokemonSpecies") -> dict[str, int]:
     default_mon = await get_default_pokemon(mon)
-    return {
-        (await bs.stat).qualified_name: bs.base_stat
-        for bs in await default_mon.pokemon_stats
-    }
+    pokemon_stats = await (await default_mon.pokemon_stats).prefetch("stat")
+    return {(await bs.stat).qualified_name: bs.base_stat for bs in pokemon_stats}
 
 
 async def get_egg_groups(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> list["PokeapiModel.classes.EggGroup"]:
-    return [await peg.egg_group for peg in await mon.pokemon_egg_groups]
+    pokemon_egg_groups = await (await mon.pokemon_egg_groups).prefetch("egg_group")
+    return [await peg.egg_group for peg in pokemon_egg_groups]
+
+
+# The first default form of each requested species, as in get_default_pokemon.
+# The species ids are passed as one JSON array so that any number of them
+# fits in a single statement.
+_default_pokemon_cte = (
+    "with default_pokemon as ("
+    "select pokemon_species_id as species_id, min(id) as pokemon_id "
+    "from pokemon_v2_pokemon "
+    "where is_default "
+    "and pokemon_species_id in (select value from json_each(?)) "
+    "group by pokemon_species_id) "
+)
+
+
+async def _species_rows(
+    statement: str, mons: Iterable["PokeapiModel.classes.PokemonSpecies"]
+) -> tuple[list[int], list[tuple]]:
+    species_ids = [mon.id for mon in mons]
+    rows = await PokeapiModel._connection.execute_fetchall(
+        statement, (json.dumps(species_ids),)
+    )
+    return species_ids, rows
+
+
+async def _group_related(
+    cls: type[PokeapiModel], species_ids: list[int], rows: list[tuple]
+) -> dict[int, list]:
+    objs = {obj.id: obj for obj in await cls.get_many({id_ for _, id_ in rows})}
+    result = {species_id: [] for species_id in species_ids}
+    for species_id, id_ in rows:
+        result[species_id].append(objs[id_])
+    return result
+
+
+async def get_mon_types_many(
+    mons: Iterable["PokeapiModel.classes.PokemonSpecies"],
+) -> dict[int, list["PokeapiModel.classes.Type"]]:
+    """get_mon_types for several species at once, keyed by species id."""
+    species_ids, rows = await _species_rows(
+        _default_pokemon_cte + "select d.species_id, pt.type_id "
+        "from default_pokemon d "
+        "join pokemon_v2_pokemontype pt on pt.pokemon_id = d.pokemon_id "
+        "order by d.species_id, pt.id",
+        mons,
+    )
+    return await _group_related(PokeapiModel.classes.Type, species_ids, rows)
+
+
+async def get_mon_abilities_many(
+    mons: Iterable["PokeapiModel.classes.PokemonSpecies"],
+) -> dict[int, list["PokeapiModel.classes.Ability"]]:
+    """get_mon_abilities for several species at once, keyed by species id."""
+    species_ids, rows = await _species_rows(
+        _default_pokemon_cte + "select d.species_id, pa.ability_id "
+        "from default_pokemon d "
+        "join pokemon_v2_pokemonability pa on pa.pokemon_id = d.pokemon_id "
+        "order by d.species_id, pa.id",
+        mons,
+    )
+    return await _group_related(PokeapiModel.classes.Ability, species_ids, rows)
+
+
+async def get_base_stats_many(
+    mons: Iterable["PokeapiModel.classes.PokemonSpecies"],
+) -> dict[int, dict[str, int]]:
+    """get_base_stats for several species at once, keyed by species id."""
+    species_ids, rows = await _species_rows(
+        _default_pokemon_cte + "select d.species_id, ps.stat_id, ps.base_stat "
+        "from default_pokemon d "
+        "join pokemon_v2_pokemonstat ps on ps.pokemon_id = d.pokemon_id "
+        "order by d.species_id, ps.id",
+        mons,
+    )
+    stat_names = await PokeapiModel.classes.Stat.load_names()
+    result = {species_id: {} for species_id in species_ids}
+    for species_id, stat_id, base_stat in rows:
+        result[species_id][stat_names.get(stat_id)] = base_stat
+    return result
+
+
+async def get_egg_groups_many(
+    mons: Iterable["PokeapiModel.classes.PokemonSpecies"],
+) -> dict[int, list["PokeapiModel.classes.EggGroup"]]:
+    """get_egg_groups for several species at once, keyed by species id."""
+    species_ids, rows = await _species_rows(
+        "select pokemon_species_id, egg_group_id "
+        "from pokemon_v2_pokemonegggroup "
+        "where pokemon_species_id in (select value from json_each(?)) "
+        "order by pokemon_species_id, id",
+        mons,
+    )
+    return await _group_related(PokeapiModel.classes.EggGroup, species_ids, rows)
 
 
 async def mon_is_in_egg_group(
@@ -249,42 +597,31 @@ async def mon_is_in_egg_group(
     return egg_group in await get_egg_groups(mon)
 
 
+async def get_breeding_chart() -> BreedingChart:
+    return await BreedingChart.load()
+
+
 async def mon_can_mate_with(
     mon: "PokeapiModel.classes.PokemonSpecies",
     mate: "PokeapiModel.classes.PokemonSpecies",
 ) -> bool:
-    # Babies can't breed
-    if mon.is_baby or mate.is_baby:
-        return False
+    return (await get_breeding_chart()).can_mate(mon.id, mate.id)
 
-    # Undiscovered can't breed together, and Ditto can't breed Ditto
-    # Other than that, same species can breed together.
-    if mon.id == mate.id:
-        return (
-            mon.id != 132
-            and mon.gender_rate not in {0, 8, -1}
-            and not await mon_is_in_undiscovered_egg_group(mon)
-        )
 
-    # Anything that's not undiscovered can breed with Ditto
-    if mon.id == 132 or mate.id == 132:
-        if mon.id == 132:
-            mon = mate
-        return not await mon_is_in_undiscovered_egg_group(mon)
+async def get_compatible_mates(
+    mon: "PokeapiModel.classes.PokemonSpecies",
+) -> list["PokeapiModel.classes.PokemonSpecies"]:
+    mate_ids = (await get_breeding_chart()).compatible_mates(mon.id)
+    return await PokeapiModel.classes.PokemonSpecies.get_many(mate_ids)
 
-    # All-male and all-female species can't breed with each other,
-    # and genderless species can't breed except with Ditto.
-    if (
-        mon.gender_rate == mate.gender_rate == 0
-        or mon.gender_rate == mate.gender_rate == 8
-        or -1 in {mon.gender_rate, mate.gender_rate}
-    ):
-        return False
 
-    # If the two species share egg groups, we good.
-    mon_egg_groups = await get_egg_groups(mon)
-    mate_egg_groups = await get_egg_groups(mate)
-    return any(grp in mon_egg_groups for grp in mate_egg_groups)
+async def get_breeding_matrix(
+    mons: typing.Optional[Iterable["PokeapiModel.classes.PokemonSpecies"]] = None,
+) -> dict[int, list[int]]:
+    """Species id -> ids of the species it can breed with, as
+    mon_can_mate_with. Covers every species if mons is None."""
+    chart = await get_breeding_chart()
+    return chart.matrix(None if mons is None else [mon.id for mon in mons])
 
 
 async def get_mon_flavor_text(
@@ -293,28 +630,42 @@ async def get_mon_flavor_text(
 ) -> str:
     flavor_texts = await mon.pokemon_species_flavor_texts
     if version:
-        return (await flavor_texts.get(language_id=9, version=version)).flavor_text
+        return (
+            await flavor_texts.get(
+                language_id=PokeapiModel.__language_id__, version=version
+            )
+        ).flavor_text
     return random.choice(
-        [txt.flavor_text for txt in flavor_texts if txt.language_id == 9]
+        [
+            txt.flavor_text
+            for txt in flavor_texts
+            if txt.language_id == PokeapiModel.__language_id__
+        ]
     )
 
 
 async def get_mon_evolution_methods(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> list["PokeapiModel.classes.PokemonEvolution"]:
-    return [await poke.pokemon_evolution for poke in await mon.evolves_into_species]
+    graph = await get_evolution_graph()
+    return await PokeapiModel.classes.PokemonEvolution.get_many(
+        evolution_id
+        for species_id in graph.children.get(mon.id, ())
+        for evolution_id in graph.evolutions[species_id]
+    )
 
 
 async def mon_is_in_undiscovered_egg_group(
     mon: "PokeapiModel.classes.PokemonSpecies",
 ) -> bool:
-    return await (await mon.pokemon_egg_groups).get(egg_group_id=15) is not None
+    return bool((await get_breeding_chart()).undiscovered >> mon.id & 1)
 
 
 async def get_move_attrs(
     move: "PokeapiModel.classes.Move",
 ) -> list["PokeapiModel.classes.MoveAttribute"]:
-    return [await mam.move_attribute for mam in await move.move_attribute_maps]
+    attribute_maps = await (await move.move_attribute_maps).prefetch("move_attribute")
+    return [await mam.move_attribute for mam in attribute_maps]
 
 
 async def get_move_description(
@@ -322,7 +673,15 @@ async def get_move_description(
 ) -> str:
     flavor_texts = await move.move_flavor_texts
     if version:
-        return (await flavor_texts.get(language_id=9, version=version)).flavor_text
+        return (
+            await flavor_texts.get(
+                language_id=PokeapiModel.__language_id__, version=version
+            )
+        ).flavor_text
     return random.choice(
-        [txt.flavor_text for txt in flavor_texts if txt.language_id == 9]
+        [
+            txt.flavor_text
+            for txt in flavor_texts
+            if txt.language_id == PokeapiModel.__language_id__
+        ]
     )
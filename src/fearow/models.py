@@ -3,24 +3,33 @@ import collections
 import difflib
 import functools
 import inspect
+import keyword
 import operator
+import os
+import pathlib
+import random
 import re
 import sqlite3
 import typing
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Mapping
 
 import asyncstdlib.builtins as abuiltins
 import asyncstdlib.functools as afunctools
 import inflect
 
 import asqlite3
+from asqlite3 import tag_queries
+
+from . import schema
+from .fuzzy import NameIndex, _isjunk
+from .identity import IdentityMap
+from .query import Query
 
 __all__ = ("PokeapiModel",)
 
 _T = typing.TypeVar("_T")
 _R = typing.TypeVar("_R")
 
-_garbage_pat = re.compile(r'[. \t-\'"]')
 DICTIONARY = [
     "characteristic",
     "description",
@@ -92,6 +101,9 @@ DICTIONARY = [
 ]
 pluralizer = inflect.engine()
 _prep_lock = asyncio.Lock()
+_names_lock = asyncio.Lock()
+# key -> future of the load running for it; see _single_flight
+_inflight: dict[typing.Hashable, asyncio.Future] = {}
 
 
 def tblname_to_classname(name: str):
@@ -108,39 +120,374 @@ def sqlite3_type(coltype: str) -> type:
 
 
 class collection(list[_T]):
-    async def get(self, **attrs) -> typing.Optional[_T]:
+    async def prefetch(self, *paths: str) -> "collection[_T]":
+        """Eagerly load relationships and backrefs of every element.
+
+        Each path is a chain of attribute names joined by double underscores,
+        i.e. "pokemon_moves__move". Every level of the path is resolved with
+        one "where col in (...)" query, and the results are stored in the
+        cached properties, so that awaiting them later does no I/O."""
+        for path in paths:
+            parts = path.split("__")
+            objs: list[PokeapiModel] = list(self)
+            while parts and objs:
+                by_class: dict[type[PokeapiModel], list[PokeapiModel]] = {}
+                for obj in objs:
+                    by_class.setdefault(obj.__class__, []).append(obj)
+                objs = []
+                consumed = None
+                for cls, instances in by_class.items():
+                    name = cls._match_relationship(parts)
+                    consumed = name.count("__") + 1
+                    objs += await cls._load_relationship(instances, name)
+                parts = parts[consumed:]
+        return self
+
+    def _resolve(self, key: str, value) -> typing.Optional[tuple[str, typing.Any]]:
+        # Map an attribute lookup to an equivalent (column, value) pair that
+        # can be read off the elements without awaiting anything.
+        cls = self[0].__class__
+        if key in getattr(cls, "__columns__", ()):
+            return key, value
+        rel = getattr(cls, "__relationships__", {}).get(key)
+        if rel is None or rel.many or rel.foreign_col != "id":
+            return None
+        if value is None:
+            return rel.local_col, None
+        if getattr(value, "__tablename__", None) == rel.target:
+            return rel.local_col, value.id
+        return None
+
+    def create_index(self, *keys: str) -> "collection[_T]":
+        """Build and cache a hash index over the given columns.
+
+        get() and filter() use, and if necessary build, these indexes on their
+        own whenever every lookup is a column or a relationship that can be
+        compared through its foreign key column."""
+        if self:
+            columns = []
+            for key in keys:
+                if (pair := self._resolve(key, None)) is None:
+                    raise AttributeError(
+                        "{} has no column or foreign key relationship {!r}".format(
+                            self[0].__class__.__name__, key
+                        )
+                    )
+                columns.append(pair[0])
+            self._index(tuple(sorted(columns)))
+        return self
+
+    def _index(self, columns: tuple[str, ...]) -> dict[tuple, list[_T]]:
+        indexes: dict[tuple[str, ...], dict[tuple, list[_T]]]
+        indexes = self.__dict__.setdefault("_indexes", {})
+        if (index := indexes.get(columns)) is None:
+            getter = operator.attrgetter(*columns)
+            index = {}
+            for elem in self:
+                key = getter(elem)
+                index.setdefault(key if len(columns) > 1 else (key,), []).append(elem)
+            indexes[columns] = index
+        return index
+
+    def _lookup(self, attrs: dict[str, typing.Any]) -> typing.Optional[list[_T]]:
+        if not self:
+            return []
+        resolved = {}
+        for key, value in attrs.items():
+            if (pair := self._resolve(key, value)) is None:
+                return None
+            resolved[pair[0]] = pair[1]
+        columns = tuple(sorted(resolved))
+        try:
+            return self._index(columns).get(tuple(resolved[c] for c in columns), [])
+        except TypeError:
+            # Unhashable column or lookup value
+            return None
+
+    async def _scan(self, attrs: dict[str, typing.Any]) -> typing.AsyncIterator[_T]:
         iscoro = inspect.isawaitable
         _all = abuiltins.all
 
         def attrget(key):
-            attrget_sync = operator.attrgetter(key.replace("__", "."))
+            path = key.split("__")
 
             async def inner(item):
-                obj = attrget_sync(item)
-                if iscoro(obj):
-                    obj = await obj
+                obj = item
+                for attr in path:
+                    obj = getattr(obj, attr)
+                    if iscoro(obj):
+                        obj = await obj
                 return obj
 
             return inner
 
-        if len(attrs) == 1:
-            k, v = attrs.popitem()
-            pred = attrget(k.replace("__", "."))
-
-            for elem in self:
-                if await pred(elem) == v:
-                    return elem
-            return None
-
-        converted = [
-            (attrget(attr.replace("__", ".")), value) for attr, value in attrs.items()
-        ]
+        converted = [(attrget(attr), value) for attr, value in attrs.items()]
 
         for elem in self:
             if await _all(await pred(elem) == value for pred, value in converted):
-                return elem
+                yield elem
+
+    async def get(self, **attrs) -> typing.Optional[_T]:
+        matches = self._lookup(attrs)
+        if matches is not None:
+            return matches[0] if matches else None
+        async for elem in self._scan(attrs):
+            return elem
         return None
 
+    async def filter(self, **attrs) -> "collection[_T]":
+        matches = self._lookup(attrs)
+        if matches is None:
+            matches = [elem async for elem in self._scan(attrs)]
+        return collection(matches)
+
+
+def _invalidates_indexes(method: Callable[..., _R]) -> Callable[..., _R]:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.__dict__.pop("_indexes", None)
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(collection, _name, _invalidates_indexes(getattr(list, _name)))
+del _name
+
+
+class Relationship(typing.NamedTuple):
+    target: str
+    local_col: str
+    foreign_col: str
+    many: bool
+
+
+_IN_CHUNK_SIZE = 500
+
+
+async def _select_in(table: str, column: str, values: Iterable) -> list[tuple]:
+    values = list(values)
+    rows = []
+    for i in range(0, len(values), _IN_CHUNK_SIZE):
+        chunk = values[i : i + _IN_CHUNK_SIZE]
+        statement = (
+            "select * "
+            'from "{}" '
+            "where {} in ({})".format(table, column, ", ".join("?" * len(chunk)))
+        )
+        rows += await PokeapiModel._connection.execute_fetchall(statement, chunk)
+    return rows
+
+
+async def _stream_rows(
+    cls: type["PokeapiModel"],
+    statement: str,
+    parameters: Iterable = (),
+    *,
+    chunk_size: typing.Optional[int] = None,
+    identity_map: bool = True,
+    tag: typing.Optional[str] = None,
+) -> typing.AsyncIterator["PokeapiModel"]:
+    # Rows are fetched one chunk at a time, and only when the consumer asks
+    # for more, so at most one chunk of rows is held here at once.
+    if not identity_map:
+        await cls.load_names()
+    # The tag must not stay set while suspended at a yield, where it would
+    # leak into the consumer's queries; the cursor remembers it for fetches.
+    with tag_queries(tag):
+        cursor = await PokeapiModel._connection.execute(statement, parameters)
+    async with cursor:
+        async for rows in cursor.chunks(chunk_size):
+            for row in rows:
+                if identity_map:
+                    yield await cls.from_row(row)
+                else:
+                    yield cls._detached(row)
+
+
+def _loaded_values(instance: "PokeapiModel") -> dict[str, typing.Any]:
+    # Compact classes have no __dict__ and keep cached properties in a slot
+    # that is only filled in once something is cached.
+    try:
+        return instance.__dict__
+    except AttributeError:
+        try:
+            return instance._relcache
+        except AttributeError:
+            instance._relcache = {}
+            return instance._relcache
+
+
+class _Null:
+    """Stands in for a missing related row on materialized models: it is
+    falsy, compares equal to None, and awaiting it gives None."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __eq__(self, other):
+        return other is None or other is self
+
+    def __hash__(self):
+        return hash(None)
+
+    def __repr__(self):
+        return "null"
+
+    def __await__(self):
+        return None
+        yield
+
+
+null = _Null()
+
+
+def _await_self(self):
+    return self
+    yield
+
+
+def _set_materialized(materialized):
+    # Materialized relationships hold models and collections directly. While
+    # they do, awaiting one, as code written for lazy relationships does,
+    # returns it unchanged; otherwise awaiting one stays an error.
+    PokeapiModel._materialized = materialized
+    for cls in (PokeapiModel, collection):
+        if materialized is not None:
+            cls.__await__ = _await_self
+        elif "__await__" in cls.__dict__:
+            del cls.__await__
+
+
+def _is_loaded(instance: "PokeapiModel", attrname: str) -> bool:
+    # Materialized values are stored as they are, not as AwaitableValues.
+    return isinstance(
+        _loaded_values(instance).get(attrname),
+        (afunctools.AwaitableValue, PokeapiModel, collection, _Null),
+    )
+
+
+def _loaded_value(instance: "PokeapiModel", attrname: str):
+    value = _loaded_values(instance)[attrname]
+    if isinstance(value, afunctools.AwaitableValue):
+        return value.value
+    return None if value is null else value
+
+
+def _set_loaded(instance: "PokeapiModel", attrname: str, value):
+    _loaded_values(instance)[attrname] = afunctools.AwaitableValue(value)
+
+
+class slot_cached_property:
+    """Async cached property for compact model classes.
+
+    Stores the same AwaitableValue as asyncstdlib's cached_property, but in
+    the instance's _relcache slot rather than its __dict__."""
+
+    def __init__(self, func: Callable[[typing.Any], typing.Awaitable], attrname: str):
+        self.func = func
+        self.attrname = attrname
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return instance._relcache[self.attrname]
+        except (AttributeError, KeyError):
+            return self._load(instance)
+
+    async def _load(self, instance):
+        value = await self.func(instance)
+        _set_loaded(instance, self.attrname, value)
+        return value
+
+
+def _compile_column_setter(
+    cls: type["PokeapiModel"],
+) -> Callable[["PokeapiModel", tuple], None]:
+    # Unpacking straight into the slots is several times faster than a
+    # setattr loop. Rows from joins may carry extra columns, hence the *_.
+    # Columns named by a keyword, such as order, can't be written as
+    # self.order, so they are unpacked into a local and set through their
+    # slot descriptor.
+    namespace = {}
+    targets = []
+    setters = []
+    for i, column in enumerate(cls.__columns__):
+        if keyword.iskeyword(column):
+            namespace["_set{}".format(i)] = cls.__dict__[column].__set__
+            targets.append("_v{}, ".format(i))
+            setters.append("    _set{0}(self, _v{0})\n".format(i))
+        else:
+            targets.append("self.{}, ".format(column))
+    exec(
+        "def _assign_columns(self, row):\n    {}*_ = row\n{}".format(
+            "".join(targets), "".join(setters)
+        ),
+        namespace,
+    )
+    return namespace["_assign_columns"]
+
+
+def _tag(cls: type["PokeapiModel"], attrname: str) -> str:
+    # The label reported with a model's queries in asqlite3 instrumentation.
+    return "{}.{}".format(cls.__name__, attrname)
+
+
+async def _single_flight(
+    key: typing.Hashable, load: Callable[[], typing.Awaitable[_R]]
+) -> _R:
+    """Return the result of load(), unless a load with the same key is
+    already running, in which case wait for that one's result instead.
+
+    Keys are (model class, id) for rows by primary key, as in the identity
+    map, and (table, column, value, many) for other lookups."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Run synchronously by fearow.sync, so nothing else can be running.
+        return await load()
+    while (future := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Load again only if it was the other caller that got cancelled.
+            if not future.cancelled():
+                raise
+    future = _inflight[key] = loop.create_future()
+    try:
+        result = await load()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        # Mark it retrieved, as there may be no one else waiting.
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _inflight[key]
+
 
 def relationship(target: str, local_col: str, foreign_col: str, attrname: str):
     async def func(instance):
@@ -153,14 +500,30 @@ def relationship(target: str, local_col: str, foreign_col: str, attrname: str):
             statement = (
                 "select * " 'from "{}" ' "where {} = ?".format(target, foreign_col)
             )
-            async with PokeapiModel._connection.execute(statement, (fk_id,)) as cursor:
-                row = await cursor.fetchone()
+
+            async def load():
+                with tag_queries(_tag(instance.__class__, attrname)):
+                    async with PokeapiModel._connection.execute(
+                        statement, (fk_id,)
+                    ) as cursor:
+                        row = await cursor.fetchone()
                 if row is not None:
-                    result = await target_cls.from_row(row)
+                    return await target_cls.from_row(row)
+
+            result = await _single_flight(
+                (
+                    (target_cls, fk_id)
+                    if foreign_col == "id"
+                    else (target, foreign_col, fk_id, False)
+                ),
+                load,
+            )
         return result
 
     func.__name__ = attrname
-    return afunctools.cached_property(func)
+    prop = afunctools.cached_property(func)
+    prop.__set_name__(None, attrname)
+    return prop
 
 
 def backref(target: str, local_col: str, foreign_col: str, attrname: str):
@@ -169,20 +532,28 @@ def backref(target: str, local_col: str, foreign_col: str, attrname: str):
             instance.classes, tblname_to_classname(target)
         )
         statement = "select * " 'from "{}" ' "where {} = ?".format(target, foreign_col)
-        async with PokeapiModel._connection.execute(
-            statement, (getattr(instance, local_col),)
-        ) as cursor:
-            result = collection(
-                [
-                    await target_cls.from_row(row)
-                    async for row in cursor
-                    if row is not None
-                ]
-            )
-        return result
+        value = getattr(instance, local_col)
+
+        async def load():
+            with tag_queries(_tag(instance.__class__, attrname)):
+                async with PokeapiModel._connection.execute(
+                    statement, (value,)
+                ) as cursor:
+                    return [
+                        await target_cls.from_row(row)
+                        async for row in cursor
+                        if row is not None
+                    ]
+
+        # Each caller gets its own collection of the shared rows.
+        return collection(
+            await _single_flight((target, foreign_col, value, True), load)
+        )
 
     func.__name__ = attrname
-    return afunctools.cached_property(func)
+    prop = afunctools.cached_property(func)
+    prop.__set_name__(None, attrname)
+    return prop
 
 
 def name_for_scalar_relationship(
@@ -225,10 +596,18 @@ class classproperty:
 
 @functools.total_ordering
 class PokeapiModel:
+    __slots__ = ()
     __abstract__ = True
     __columns__: dict[str, type] = {}
-    __cache__: dict[tuple[type["PokeapiModel"], int], "PokeapiModel"] = {}
+    __relationships__: dict[str, Relationship] = {}
+    __cache__: IdentityMap = IdentityMap()
     __prepared__ = False
+    __language_id__ = 9
+    _name_tables: dict[tuple[type["PokeapiModel"], int], dict[int, str]] = {}
+    _name_indexes: dict[tuple[type["PokeapiModel"], int], NameIndex] = {}
+    _id_lists: dict[tuple, list[int]] = {}
+    # class -> id -> instance, for every row once materialize() has run
+    _materialized: typing.Optional[dict[type, dict[int, "PokeapiModel"]]] = None
     classes = None
     _connection: typing.Optional[asqlite3.Connection] = None
 
@@ -240,28 +619,85 @@ class PokeapiModel:
     async def from_row(
         cls, row: typing.Optional[tuple]
     ) -> typing.Optional["PokeapiModel"]:
-        obj = cls.__cache__.get((cls, row[0])) or cls(row)
-        try:
-            obj.qualified_name = await obj._qualified_name
-        except AttributeError:
-            pass
+        if PokeapiModel._materialized is not None:
+            # The identity map may have forgotten a materialized object, but
+            # it must still be the one returned for its row.
+            if (obj := PokeapiModel._materialized[cls].get(row[0])) is not None:
+                return obj
+        # Callers that look the row up first count the hit or miss there.
+        obj = cls.__cache__._lookup((cls, row[0])) or cls(row)
+        if (cls, PokeapiModel.__language_id__) not in PokeapiModel._name_tables:
+            await cls.load_names()
         return obj
 
     def __init__(self, row: tuple):
         if self.__abstract__:
             raise TypeError("trying to instantiate an abstract base class")
         self.__class__.__cache__[(self.__class__, row[0])] = self
+        self._assign_columns(row)
+
+    @classmethod
+    def _detached(cls: type[_T], row: tuple) -> _T:
+        """Build an object from a row without registering it in the identity
+        map."""
+        if cls.__abstract__:
+            raise TypeError("trying to instantiate an abstract base class")
+        obj = cls.__new__(cls)
+        obj._assign_columns(row)
+        return obj
+
+    def _assign_columns(self, row: tuple):
         for colname, value in zip(self.__columns__, row):
             setattr(self, colname, value)
-        self.qualified_name = None
 
     def __iter__(self):
         for column in self.__columns__:
             yield column, getattr(self, column)
 
     @classmethod
-    async def _prepare(cls, connection: asqlite3.Connection):
+    def _build_classes(
+        cls, layout: "schema.Layout", *, compact: bool = False
+    ) -> dict[str, type["PokeapiModel"]]:
         classes: dict[str, type["PokeapiModel"]] = {}
+        for tbl_name, spec in layout.items():
+            cls_name = tblname_to_classname(tbl_name)
+            colspec: dict[str, type] = {
+                colname: sqlite3_type(coltype)
+                for colname, coltype in spec["columns"].items()
+            }
+            namespace = {
+                "__abstract__": False,
+                "__columns__": colspec,
+                "__relationships__": {},
+            }
+            if compact:
+                namespace["__slots__"] = (
+                    *colspec,
+                    "_relcache",
+                    "__weakref__",
+                )
+            else:
+                namespace |= colspec
+
+            table_cls = type(cls_name, (cls,), namespace)
+            if compact:
+                table_cls._assign_columns = _compile_column_setter(table_cls)
+            classes[cls_name] = table_cls
+        for tbl_name, spec in layout.items():
+            table_cls = classes[tblname_to_classname(tbl_name)]
+            for attrname, rel in spec["relationships"].items():
+                rel = Relationship(*rel)
+                factory = backref if rel.many else relationship
+                prop = factory(rel.target, rel.local_col, rel.foreign_col, attrname)
+                if compact:
+                    prop = slot_cached_property(prop.func, attrname)
+                setattr(table_cls, attrname, prop)
+                table_cls.__relationships__[attrname] = rel
+        return classes
+
+    @classmethod
+    async def _introspect(cls, connection: asqlite3.Connection) -> "schema.Layout":
+        layout: schema.Layout = {}
         tbl_names = [
             x
             async for x, in await connection.execute(
@@ -272,23 +708,20 @@ class PokeapiModel:
             )
         ]
         for tbl_name in tbl_names:
-            cls_name = tblname_to_classname(tbl_name)
-            colspec: dict[str, type] = {
-                colname: sqlite3_type(coltype)
-                async for cid, colname, coltype, notnull, dflt, pk in await connection.execute(
-                    'pragma table_info ("{}")'.format(tbl_name)
-                )
+            layout[tbl_name] = {
+                "columns": {
+                    colname: coltype
+                    async for cid, colname, coltype, notnull, dflt, pk in await connection.execute(
+                        'pragma table_info ("{}")'.format(tbl_name)
+                    )
+                },
+                "relationships": {},
             }
-
-            table_cls = type(
-                cls_name,
-                (cls,),
-                {"__abstract__": False, "__columns__": colspec} | colspec,
-            )
-            classes[cls_name] = table_cls
+        # Relationship names are derived from the classes, so build bare ones
+        # to name them against.
+        classes = cls._build_classes(layout)
         for tbl_name in tbl_names:
-            cls_name = tblname_to_classname(tbl_name)
-            table_cls = classes[cls_name]
+            table_cls = classes[tblname_to_classname(tbl_name)]
             foreign_keys = await connection.execute_fetchall(
                 'pragma foreign_key_list ("{}")'.format(tbl_name)
             )
@@ -302,111 +735,508 @@ class PokeapiModel:
                 on_delete,
                 match,
             ) in foreign_keys:
-                dest_cls_name = tblname_to_classname(dest)
-                dest_cls = classes[dest_cls_name]
+                dest_cls = classes[tblname_to_classname(dest)]
                 manytoonekey = name_for_scalar_relationship(
                     table_cls, dest_cls, local_col, dest_col, foreign_keys
                 )
                 onetomanykey = name_for_collection_relationship(
                     dest_cls, table_cls, dest_col, local_col, foreign_keys
                 )
+                layout[tbl_name]["relationships"][manytoonekey] = [
+                    dest,
+                    local_col,
+                    dest_col,
+                    False,
+                ]
+                layout[dest]["relationships"][onetomanykey] = [
+                    tbl_name,
+                    dest_col,
+                    local_col,
+                    True,
+                ]
+        return layout
 
-                setattr(
-                    table_cls,
-                    manytoonekey,
-                    relationship(dest, local_col, dest_col, manytoonekey),
-                )
-                setattr(
-                    dest_cls,
-                    onetomanykey,
-                    backref(tbl_name, dest_col, local_col, onetomanykey),
-                )
+    @classmethod
+    async def _prepare(
+        cls,
+        connection: asqlite3.Connection,
+        snapshot: typing.Optional[pathlib.Path] = None,
+        compact: bool = False,
+    ):
+        db_file = schema.database_file(connection)
+        with tag_queries("PokeapiModel.prepare"):
+            if snapshot is not None and db_file is not None:
+                layout = schema.load_snapshot(snapshot, db_file)
+                if layout is None:
+                    layout = await cls._introspect(connection)
+                    schema.save_snapshot(snapshot, db_file, layout)
+            else:
+                layout = await cls._introspect(connection)
+        classes = cls._build_classes(layout, compact=compact)
         cls.classes = type("Base", (object,), classes)
 
     @classmethod
-    async def prepare(cls, connection: asqlite3.Connection):
+    async def prepare(
+        cls,
+        connection: asqlite3.Connection,
+        *,
+        identity_map: typing.Optional[IdentityMap] = None,
+        schema_snapshot: typing.Union[str, os.PathLike, bool] = False,
+        compact: bool = False,
+    ):
+        """Map the tables of the database to model classes.
+
+        If schema_snapshot is a path, or True for the default path next to the
+        database file, the class layout is read from that snapshot instead of
+        introspecting the database, and the snapshot is rewritten whenever the
+        database file changes.
+
+        If compact is true, the classes store columns in __slots__ rather
+        than a per-instance __dict__, which takes less memory per row."""
         cls._connection = connection
+        # Rows loaded or materialized from, and ids and names listed in, the
+        # previous connection's database.
+        if identity_map is not None:
+            cls.__cache__ = identity_map
+        cls.__cache__.clear()
+        _set_materialized(None)
+        PokeapiModel._id_lists.clear()
+        PokeapiModel._name_tables.clear()
+        PokeapiModel._name_indexes.clear()
         if not cls.__prepared__:
             async with _prep_lock:
                 if not cls.__prepared__:
-                    await cls._prepare(connection)
+                    if schema_snapshot is True:
+                        db_file = schema.database_file(connection)
+                        snapshot = db_file and schema.default_snapshot_path(db_file)
+                    elif schema_snapshot:
+                        snapshot = pathlib.Path(schema_snapshot)
+                    else:
+                        snapshot = None
+                    await cls._prepare(connection, snapshot, compact)
                     cls.__prepared__ = True
 
-        differ = difflib.SequenceMatcher(lambda s: _garbage_pat.match(s) is not None)
-
+        # A fresh matcher per call, since pooled connections may evaluate
+        # this on several reader threads at once.
         def fuzzy_ratio(a, b):
-            differ.set_seqs(a.casefold(), b.casefold())
-            return differ.ratio()
+            return difflib.SequenceMatcher(_isjunk, a.casefold(), b.casefold()).ratio()
 
         await connection.create_function("FUZZY_RATIO", 2, fuzzy_ratio)
 
     @classmethod
-    async def get(cls: type[_T], id_: int) -> typing.Optional[_T]:
-        if (cls, id_) in cls.__cache__:
-            return cls.__cache__.get((cls, id_))
-        async with cls._connection.execute(
-            "select * " "from {} " "where id = ?".format(cls.__tablename__), (id_,)
-        ) as cur:
-            row = await cur.fetchone()
-        if row:
-            return await cls.from_row(row)
+    def _match_relationship(cls, parts: list[str]) -> str:
+        # Backref names may themselves contain a double underscore, so
+        # take the longest prefix of the path that names a relationship.
+        for i in range(len(parts), 0, -1):
+            name = "__".join(parts[:i])
+            if name in cls.__relationships__:
+                return name
+        raise AttributeError(
+            "{} has no relationship {!r}".format(cls.__name__, parts[0])
+        )
 
     @classmethod
-    async def get_random(cls: type[_T]) -> _T:
-        async with cls._connection.execute(
-            "select * " "from {} " "order by random()".format(cls.__tablename__)
-        ) as cur:
-            return await cls.from_row(await cur.fetchone())
-
-    @afunctools.cached_property
-    async def _qualified_name(self):
-        if self.__class__.__name__ == "Language":
-            attrs = {"local_language_id": 9}
-            collection_name = "language_names__language"
+    async def _load_relationship(
+        cls, instances: list["PokeapiModel"], attrname: str
+    ) -> list["PokeapiModel"]:
+        rel = cls.__relationships__[attrname]
+        target_cls: type[PokeapiModel] = getattr(
+            cls.classes, tblname_to_classname(rel.target)
+        )
+        pending = [obj for obj in instances if not _is_loaded(obj, attrname)]
+        keys = {getattr(obj, rel.local_col) for obj in pending} - {None}
+        found: dict[typing.Any, typing.Any] = {}
+        if rel.many:
+            with tag_queries(_tag(cls, attrname)):
+                rows = await _select_in(rel.target, rel.foreign_col, keys)
+            for row in rows:
+                target = await target_cls.from_row(row)
+                found.setdefault(getattr(target, rel.foreign_col), []).append(target)
+            for obj in pending:
+                _set_loaded(
+                    obj,
+                    attrname,
+                    collection(found.get(getattr(obj, rel.local_col), ())),
+                )
         else:
-            attrs = {"language_id": 9}
-            collection_name = (
-                re.sub(r"([a-z])([A-Z])", r"\1_\2", self.__class__.__name__).lower()
-                + "_names"
-            )
-        names = await getattr(self, collection_name)
-        return (await names.get(**attrs)).name
+            for key in keys:
+                if (target := cls.__cache__.get((target_cls, key))) is not None:
+                    found[key] = target
+            missing = keys - found.keys()
+            with tag_queries(_tag(cls, attrname)):
+                rows = await _select_in(rel.target, rel.foreign_col, missing)
+            for row in rows:
+                target = await target_cls.from_row(row)
+                found[getattr(target, rel.foreign_col)] = target
+            for obj in pending:
+                _set_loaded(obj, attrname, found.get(getattr(obj, rel.local_col)))
+
+        related = []
+        seen = set()
+        for obj in instances:
+            value = _loaded_value(obj, attrname)
+            for target in value if rel.many else (value,):
+                if target is not None and id(target) not in seen:
+                    seen.add(id(target))
+                    related.append(target)
+        return related
 
     @classmethod
-    async def get_named(cls: type[_T], name: str, *, cutoff=0.9) -> typing.Optional[_T]:
-        name_cls = getattr(cls.classes, cls.__name__ + "Name")
+    async def get(
+        cls: type[_T],
+        id_: int,
+        *,
+        prefetch: typing.Union[str, Iterable[str]] = (),
+    ) -> typing.Optional[_T]:
+        if isinstance(prefetch, str):
+            prefetch = (prefetch,)
+        if (obj := cls.__cache__.get((cls, id_))) is None:
+            if PokeapiModel._materialized is not None:
+                # Every row is in memory, so a miss means there is none.
+                obj = PokeapiModel._materialized[cls].get(id_)
+            else:
+
+                async def load():
+                    with tag_queries(_tag(cls, "get")):
+                        async with cls._connection.execute(
+                            "select * "
+                            "from {} "
+                            "where id = ?".format(cls.__tablename__),
+                            (id_,),
+                        ) as cur:
+                            row = await cur.fetchone()
+                    return await cls.from_row(row) if row else None
+
+                obj = await _single_flight((cls, id_), load)
+            if obj is None:
+                return None
+        if prefetch:
+            await collection([obj]).prefetch(*prefetch)
+        return obj
+
+    @classmethod
+    def query(cls: type[_T]) -> Query[_T]:
+        """Return a Query over every row of this class."""
+        return Query(cls)
+
+    @classmethod
+    def filter(cls: type[_T], **attrs) -> Query[_T]:
+        """Return a Query for the rows matching attrs, using the same lookups
+        as collection.get, evaluated by SQLite:
+
+            await PokemonSpecies.filter(generation__name="generation-i")
+        """
+        return Query(cls).filter(**attrs)
+
+    @classmethod
+    def where(cls: type[_T], condition: str, parameters=()) -> Query[_T]:
+        """Return a Query for the rows matching a raw SQL condition."""
+        return Query(cls).where(condition, parameters)
+
+    @classmethod
+    def stream(
+        cls: type[_T],
+        *,
+        where: typing.Optional[str] = None,
+        parameters=(),
+        chunk_size: typing.Optional[int] = None,
+        identity_map: bool = True,
+    ) -> typing.AsyncIterator[_T]:
+        """Iterate over every row, optionally only those matching the SQL
+        condition where, fetching at most chunk_size rows at a time.
+
+        With identity_map=False the objects are not kept in the identity
+        map, so a full scan runs in constant memory; they are then distinct
+        from the objects returned by get and relationships."""
+        statement = "select * " 'from "{}"'.format(cls.__tablename__)
+        if where:
+            statement += " where " + where
+        return _stream_rows(
+            cls,
+            statement,
+            parameters,
+            chunk_size=chunk_size,
+            identity_map=identity_map,
+            tag=_tag(cls, "stream"),
+        )
+
+    def stream_backref(
+        self,
+        attrname: str,
+        *,
+        chunk_size: typing.Optional[int] = None,
+        identity_map: bool = True,
+    ) -> typing.AsyncIterator["PokeapiModel"]:
+        """Iterate over the rows of a backref, i.e. "pokemon_moves", in
+        chunks instead of loading the whole collection. The backref's cached
+        property is left untouched."""
+        rel = self.__relationships__[attrname]
+        if not rel.many:
+            raise TypeError("{!r} is not a backref".format(attrname))
+        target_cls = getattr(self.classes, tblname_to_classname(rel.target))
+        statement = (
+            "select * " 'from "{}" ' "where {} = ?".format(rel.target, rel.foreign_col)
+        )
+        return _stream_rows(
+            target_cls,
+            statement,
+            (getattr(self, rel.local_col),),
+            chunk_size=chunk_size,
+            identity_map=identity_map,
+            tag=_tag(self.__class__, attrname),
+        )
+
+    @classmethod
+    async def _ids(cls, where: typing.Optional[str] = None, parameters=()) -> list[int]:
+        # Keyed like asqlite3.ResultCache: a mapping by its items, since
+        # iterating over it would only give the parameter names.
+        if isinstance(parameters, Mapping):
+            key = (cls, where, frozenset(parameters.items()))
+        else:
+            parameters = tuple(parameters)
+            key = (cls, where, parameters)
+        if (ids := PokeapiModel._id_lists.get(key)) is None:
+            statement = "select id " 'from "{}"'.format(cls.__tablename__)
+            if where:
+                statement += " where " + where
+            with tag_queries(_tag(cls, "get_random")):
+                rows = await cls._connection.execute_fetchall(statement, parameters)
+            ids = PokeapiModel._id_lists[key] = [id_ for id_, in rows]
+        return ids
+
+    @classmethod
+    async def get_random(
+        cls: type[_T], *, where: typing.Optional[str] = None, parameters=()
+    ) -> typing.Optional[_T]:
+        """Return a random row, optionally only among those matching the SQL
+        condition where.
+
+        The ids to choose from are loaded once per condition and cached, so
+        only the chosen row has to be queried."""
+        if ids := await cls._ids(where, parameters):
+            return await cls.get(random.choice(ids))
+
+    @classmethod
+    async def get_random_many(
+        cls: type[_T],
+        n: int,
+        *,
+        unique=True,
+        where: typing.Optional[str] = None,
+        parameters=(),
+    ) -> list[_T]:
+        """Return n random rows, loaded with one query. If unique, no row is
+        repeated, and n may not exceed the number of matching rows."""
+        ids = await cls._ids(where, parameters)
+        chosen = random.sample(ids, n) if unique else random.choices(ids, k=n)
+        return await cls.get_many(chosen)
+
+    @classmethod
+    def _name_source(cls) -> typing.Optional[tuple[str, str, str]]:
+        """Return the table of localized names for this class, along with its
+        column referencing this class and its language column."""
+        name_cls = getattr(cls.classes, cls.__name__ + "Name", None)
+        if name_cls is None:
+            return None
         fk_name = re.sub(r"([a-z])([A-Z])", r"\1_\2", cls.__name__).lower() + "_id"
-        select = "SELECT * FROM {0} INNER JOIN {1} ON {0}.id = {1}.{2}"
-        fuzzy_clause = "FUZZY_RATIO({1}.name, :name) > :cutoff"
-        if hasattr(cls, "name"):
-            fuzzy_clause += " OR FUZZY_RATIO({0}.name, :name) > :cutoff"
         lang_attr_name = (
             "local_language_id" if cls.__name__ == "Language" else "language_id"
         )
-        lang_clause = "{1}.{3} = 9"
-        statement = f"{select} WHERE {lang_clause} AND ({fuzzy_clause})".format(
-            cls.__tablename__, name_cls.__tablename__, fk_name, lang_attr_name
+        if not {fk_name, lang_attr_name, "name"} <= name_cls.__columns__.keys():
+            return None
+        return name_cls.__tablename__, fk_name, lang_attr_name
+
+    @classmethod
+    async def load_names(
+        cls, language_id: typing.Optional[int] = None
+    ) -> dict[int, str]:
+        """Load the names of every row of this class in one query.
+
+        Returns a mapping of id to name in the given language, which defaults
+        to the one chosen with set_language."""
+        if language_id is None:
+            language_id = PokeapiModel.__language_id__
+        key = (cls, language_id)
+        if (names := PokeapiModel._name_tables.get(key)) is not None:
+            return names
+        async with _names_lock:
+            if (names := PokeapiModel._name_tables.get(key)) is not None:
+                return names
+            names = {}
+            if (source := cls._name_source()) is not None:
+                tbl_name, fk_name, lang_attr_name = source
+                statement = (
+                    "select {1}, name "
+                    'from "{0}" '
+                    "where {2} = ?".format(tbl_name, fk_name, lang_attr_name)
+                )
+                with tag_queries(_tag(cls, "load_names")):
+                    rows = await cls._connection.execute_fetchall(
+                        statement, (language_id,)
+                    )
+                for id_, name in rows:
+                    names.setdefault(id_, name)
+            PokeapiModel._name_tables[key] = names
+        return names
+
+    @classmethod
+    async def load_all_names(cls, language_id: typing.Optional[int] = None):
+        """Load the name tables of every mapped class up front."""
+        for name, table_cls in vars(cls.classes).items():
+            if not name.startswith("__"):
+                await table_cls.load_names(language_id)
+
+    @classmethod
+    async def set_language(cls, language: typing.Union[int, str]):
+        """Select the language of qualified_name and name lookups, either by
+        Language id or by ISO 639 code."""
+        if isinstance(language, str):
+            rows = await cls._connection.execute_fetchall(
+                "select id " 'from "pokemon_v2_language" ' "where iso639 = ?",
+                (language,),
+            )
+            if not rows:
+                raise ValueError("unknown language {!r}".format(language))
+            language = rows[0][0]
+        PokeapiModel.__language_id__ = language
+        # Rows already loaded expect their names to be available.
+        for table_cls in {table_cls for table_cls, _ in PokeapiModel._name_tables}:
+            await table_cls.load_names()
+
+    @property
+    def qualified_name(self) -> typing.Optional[str]:
+        names = PokeapiModel._name_tables.get(
+            (self.__class__, PokeapiModel.__language_id__)
         )
-        async with cls._connection.execute(
-            statement, dict(name=name, cutoff=cutoff)
-        ) as cur:
-            row = await cur.fetchone()
-        if row:
-            return await cls.from_row(row)
+        if names is None:
+            return None
+        return names.get(self.id)
+
+    @classmethod
+    async def get_many(cls: type[_T], ids: Iterable[int]) -> list[_T]:
+        """Load several rows by id with a single query, in the order given.
+
+        Ids with no row are skipped."""
+        ids = list(ids)
+        if PokeapiModel._materialized is not None:
+            objs = PokeapiModel._materialized[cls]
+            return [objs[id_] for id_ in ids if id_ in objs]
+        found = {}
+        missing = []
+        for id_ in ids:
+            if (obj := cls.__cache__.get((cls, id_))) is not None:
+                found[id_] = obj
+            else:
+                missing.append(id_)
+        with tag_queries(_tag(cls, "get_many")):
+            rows = await _select_in(cls.__tablename__, "id", set(missing))
+        for row in rows:
+            obj = await cls.from_row(row)
+            found[obj.id] = obj
+        return [found[id_] for id_ in ids if id_ in found]
+
+    @classmethod
+    async def materialize(cls, *, chunk_size: typing.Optional[int] = None):
+        """Load every row of every table, and set every relationship and
+        backref on every object.
+
+        Each table is read in one pass, and relationships are then resolved
+        in memory. Afterwards, reading a relationship gives the related
+        object, a collection, or null if there is no related row, without
+        awaiting anything. null is falsy and equal to None, but is not None.
+        Until prepare runs again, models, collections and null are
+        awaitable, so code that awaits relationships still works. get and get_many no
+        longer query the database. The rows stay in memory, even if the
+        identity map forgets them, until prepare runs again, which connect
+        does."""
+        materialized: dict[type[PokeapiModel], dict[int, PokeapiModel]] = {}
+        classes = [
+            value
+            for key, value in vars(cls.classes).items()
+            if not key.startswith("__")
+        ]
+        for model in classes:
+            statement = 'select * from "{}"'.format(model.__tablename__)
+            materialized[model] = {
+                obj.id: obj
+                async for obj in _stream_rows(
+                    model,
+                    statement,
+                    chunk_size=chunk_size,
+                    tag=_tag(model, "materialize"),
+                )
+            }
+
+        # (class, column) -> value -> objects with that value in the column
+        groups: dict[tuple[type[PokeapiModel], str], dict] = {}
+        for model in classes:
+            objs = materialized[model].values()
+            for attrname, rel in model.__relationships__.items():
+                target_cls = getattr(cls.classes, tblname_to_classname(rel.target))
+                if not rel.many and rel.foreign_col == "id":
+                    targets = materialized[target_cls]
+                    for obj in objs:
+                        target = targets.get(getattr(obj, rel.local_col))
+                        _loaded_values(obj)[attrname] = (
+                            null if target is None else target
+                        )
+                    continue
+                if (group := groups.get((target_cls, rel.foreign_col))) is None:
+                    group = groups[target_cls, rel.foreign_col] = {}
+                    for target in materialized[target_cls].values():
+                        group.setdefault(getattr(target, rel.foreign_col), []).append(
+                            target
+                        )
+                for obj in objs:
+                    related = group.get(getattr(obj, rel.local_col), ())
+                    _loaded_values(obj)[attrname] = (
+                        collection(related)
+                        if rel.many
+                        else related[0] if related else null
+                    )
+        _set_materialized(materialized)
+
+    @classmethod
+    async def name_index(cls, language_id: typing.Optional[int] = None) -> NameIndex:
+        """Return the fuzzy index over this class's localized names and, if
+        it has one, its name column. It is built once per language."""
+        if language_id is None:
+            language_id = PokeapiModel.__language_id__
+        key = (cls, language_id)
+        if (index := PokeapiModel._name_indexes.get(key)) is None:
+            entries = list((await cls.load_names(language_id)).items())
+            if "name" in cls.__columns__:
+                with tag_queries(_tag(cls, "name_index")):
+                    entries += await cls._connection.execute_fetchall(
+                        "select id, name " 'from "{}"'.format(cls.__tablename__)
+                    )
+            index = PokeapiModel._name_indexes[key] = NameIndex(entries)
+        return index
+
+    @classmethod
+    async def get_named(cls: type[_T], name: str, *, cutoff=0.9) -> typing.Optional[_T]:
+        matches = await cls.get_named_many(name, cutoff=cutoff, limit=1)
+        if matches:
+            return matches[0][0]
+
+    @classmethod
+    async def get_named_many(
+        cls: type[_T], name: str, *, cutoff=0.6, limit: typing.Optional[int] = 5
+    ) -> list[tuple[_T, float]]:
+        """Return up to limit (object, score) pairs whose name matches with a
+        similarity above cutoff, best match first."""
+        index = await cls.name_index()
+        matches = index.search(name, cutoff=cutoff, limit=limit)
+        objs = {obj.id: obj for obj in await cls.get_many(id_ for id_, _ in matches)}
+        return [(objs[id_], score) for id_, score in matches if id_ in objs]
 
     def __str__(self):
-        try:
-            return self.qualified_name
-        except AttributeError:
+        if (name := self.qualified_name) is None:
             return "<{0.__class__.__name__} id={0.id}>".format(self)
+        return name
 
     def __repr__(self):
-        try:
-            return "<{0.__class__.__name__} id={0.id} name={0.qualified_name}>".format(
-                self
-            )
-        except AttributeError:
-            return "<{0.__class__.__name__} id={0.id}>".format(self)
+        return "<{0.__class__.__name__} id={0.id} name={0.qualified_name}>".format(self)
 
     def __eq__(self, other):
         try:
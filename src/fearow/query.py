@@ -0,0 +1,235 @@
+import typing
+from collections.abc import Iterable, Mapping
+
+from asqlite3 import tag_queries
+
+from . import models
+
+__all__ = ("Query",)
+
+_T = typing.TypeVar("_T")
+
+# lookup suffix -> condition on a column, taking the value as its parameter
+_LOOKUPS: dict[str, str] = {
+    "exact": "{} = ?",
+    "ne": "{} != ?",
+    "lt": "{} < ?",
+    "lte": "{} <= ?",
+    "gt": "{} > ?",
+    "gte": "{} >= ?",
+    "contains": "instr({}, ?) > 0",
+    "startswith": "instr({}, ?) = 1",
+}
+_LOOKUP_NAMES = {*_LOOKUPS, "in", "isnull"}
+
+
+def _sql_value(value):
+    # Model instances compare through their primary key.
+    return value.id if isinstance(value, models.PokeapiModel) else value
+
+
+class Query(typing.Generic[_T]):
+    """A select statement over one model class, built up by chaining.
+
+    Conditions use the double underscore syntax of collection.get: each
+    part names a column or a relationship of the class reached so far, and
+    relationships are followed with joins on the foreign keys found by
+    prepare. The last part may be one of the lookups exact, ne, lt, lte,
+    gt, gte, in, isnull, contains or startswith. Every method returns a new
+    Query; awaiting one runs it and returns a collection."""
+
+    def __init__(self, model: type[_T]):
+        self.model = model
+        self._joins: dict[tuple[str, ...], tuple[str, str]] = {}
+        self._conditions: list[str] = []
+        self._parameters: list = []
+        self._order: list[str] = []
+        self._limit: typing.Optional[int] = None
+        self._offset: typing.Optional[int] = None
+        self._distinct = False
+
+    def _clone(self) -> "Query[_T]":
+        clone = object.__new__(self.__class__)
+        clone.__dict__ = self.__dict__ | {
+            "_joins": dict(self._joins),
+            "_conditions": list(self._conditions),
+            "_parameters": list(self._parameters),
+            "_order": list(self._order),
+        }
+        return clone
+
+    @property
+    def _tag(self) -> str:
+        return models._tag(self.model, "query")
+
+    @property
+    def _table(self) -> str:
+        return self.model.__tablename__
+
+    def _column(self, key: str) -> tuple[str, str]:
+        """Resolve a lookup key to a qualified column and a lookup name,
+        adding whatever joins it needs."""
+        parts = key.split("__")
+        cls = self.model
+        alias = self._table
+        path: tuple[str, ...] = ()
+        i = 0
+        while i < len(parts):
+            if parts[i] in cls.__columns__:
+                column = '"{}"."{}"'.format(alias, parts[i])
+                i += 1
+                break
+            name = cls._match_relationship(parts[i:])
+            rel: models.Relationship = cls.__relationships__[name]
+            i += name.count("__") + 1
+            last = i == len(parts) or parts[i] in _LOOKUP_NAMES
+            if last and not rel.many and rel.foreign_col == "id":
+                # Compare the foreign key rather than joining the target.
+                column = '"{}"."{}"'.format(alias, rel.local_col)
+                break
+            path += (name,)
+            if path not in self._joins:
+                target_alias = "j{}".format(len(self._joins) + 1)
+                self._joins[path] = (
+                    target_alias,
+                    'left join "{0}" {1} on {1}."{2}" = "{3}"."{4}"'.format(
+                        rel.target,
+                        target_alias,
+                        rel.foreign_col,
+                        alias,
+                        rel.local_col,
+                    ),
+                )
+                self._distinct = self._distinct or rel.many
+            alias = self._joins[path][0]
+            cls = getattr(cls.classes, models.tblname_to_classname(rel.target))
+            if last:
+                column = '{}."id"'.format(alias)
+                break
+        else:
+            raise AttributeError(
+                "{} has no column {!r}".format(self.model.__name__, key)
+            )
+        lookup = "__".join(parts[i:]) or "exact"
+        if lookup not in _LOOKUP_NAMES:
+            raise ValueError("unsupported lookup {!r} in {!r}".format(lookup, key))
+        return column, lookup
+
+    def filter(self, **attrs) -> "Query[_T]":
+        """Add conditions, all of which must hold."""
+        query = self._clone()
+        for key, value in attrs.items():
+            column, lookup = query._column(key)
+            if lookup == "isnull":
+                query._conditions.append(
+                    "{} is {}null".format(column, "" if value else "not ")
+                )
+            elif lookup == "in":
+                values = [_sql_value(v) for v in value]
+                query._conditions.append(
+                    "{} in ({})".format(column, ", ".join("?" * len(values)))
+                    if values
+                    else "0"
+                )
+                query._parameters += values
+            elif value is None and lookup in ("exact", "ne"):
+                negate = "" if lookup == "exact" else "not "
+                query._conditions.append("{} is {}null".format(column, negate))
+            else:
+                query._conditions.append(_LOOKUPS[lookup].format(column))
+                query._parameters.append(_sql_value(value))
+        return query
+
+    def where(self, condition: str, parameters: Iterable = ()) -> "Query[_T]":
+        """Add a raw SQL condition. Columns of the model's own table should
+        be qualified with its table name if the query also has joins.
+
+        The condition is combined with those generated by filter, which use
+        positional ? parameters, so its parameters must be a sequence."""
+        if isinstance(parameters, Mapping):
+            raise TypeError("where takes positional parameters, not a mapping")
+        query = self._clone()
+        query._conditions.append("({})".format(condition))
+        query._parameters += parameters
+        return query
+
+    def order_by(self, *keys: str) -> "Query[_T]":
+        """Sort by the given keys, which use the same syntax as filter; a
+        leading "-" sorts in descending order."""
+        query = self._clone()
+        for key in keys:
+            descending = key.startswith("-")
+            column, lookup = query._column(key.lstrip("-"))
+            if lookup != "exact":
+                raise ValueError("cannot order by a lookup: {!r}".format(key))
+            query._order.append(column + (" desc" if descending else ""))
+        return query
+
+    def limit(
+        self, n: typing.Optional[int], offset: typing.Optional[int] = None
+    ) -> "Query[_T]":
+        query = self._clone()
+        query._limit = n
+        query._offset = offset
+        return query
+
+    def _from_clause(self) -> str:
+        statement = 'from "{}"'.format(self._table)
+        for alias, join in self._joins.values():
+            statement += " " + join
+        if self._conditions:
+            statement += " where " + " and ".join(self._conditions)
+        return statement
+
+    def _select(self, columns: str, *, ordered: bool = True) -> str:
+        statement = "select {}{} {}".format(
+            "distinct " if self._distinct else "", columns, self._from_clause()
+        )
+        if self._order and ordered:
+            statement += " order by " + ", ".join(self._order)
+        if self._limit is not None or self._offset is not None:
+            limit = -1 if self._limit is None else int(self._limit)
+            statement += " limit {}".format(limit)
+            if self._offset is not None:
+                statement += " offset {}".format(int(self._offset))
+        return statement
+
+    @property
+    def sql(self) -> str:
+        return self._select('"{}".*'.format(self._table))
+
+    async def all(self) -> "models.collection[_T]":
+        with tag_queries(self._tag):
+            rows = await self.model._connection.execute_fetchall(
+                self.sql, self._parameters
+            )
+        return models.collection([await self.model.from_row(row) for row in rows])
+
+    def stream(
+        self, *, chunk_size: typing.Optional[int] = None, identity_map: bool = True
+    ) -> typing.AsyncIterator[_T]:
+        """Iterate over the results chunk by chunk, as PokeapiModel.stream."""
+        return models._stream_rows(
+            self.model,
+            self.sql,
+            self._parameters,
+            chunk_size=chunk_size,
+            identity_map=identity_map,
+            tag=self._tag,
+        )
+
+    async def first(self) -> typing.Optional[_T]:
+        results = await self.limit(1, self._offset).all()
+        return results[0] if results else None
+
+    async def count(self) -> int:
+        limited = self._limit is not None or self._offset is not None
+        statement = self._select('"{}"."id"'.format(self._table), ordered=limited)
+        with tag_queries(self._tag):
+            ((count,),) = await self.model._connection.execute_fetchall(
+                "select count(*) from ({})".format(statement), self._parameters
+            )
+        return count
+
+    def __await__(self):
+        return self.all().__await__()
@@ -0,0 +1,76 @@
+import json
+import os
+import pathlib
+import typing
+import urllib.parse
+import warnings
+
+import asqlite3
+
+__all__ = ("Layout", "database_file", "default_snapshot_path")
+
+# Bump whenever the layout format or the relationship naming rules change,
+# so that stale snapshots are rebuilt.
+SNAPSHOT_VERSION = 1
+
+
+class TableSpec(typing.TypedDict):
+    columns: dict[str, str]
+    # attribute name -> [target table, local column, foreign column, many]
+    relationships: dict[str, list]
+
+
+Layout = dict[str, TableSpec]
+
+
+def database_file(connection: asqlite3.Connection) -> typing.Optional[pathlib.Path]:
+    """Return the file backing the connection, or None for in-memory databases."""
+    path = os.fspath(connection._db_path)
+    if path.startswith("file:"):
+        parts = urllib.parse.urlsplit(path)
+        if dict(urllib.parse.parse_qsl(parts.query)).get("mode") == "memory":
+            return None
+        path = urllib.parse.unquote(parts.path)
+    if path in ("", ":memory:") or not os.path.isfile(path):
+        return None
+    return pathlib.Path(path)
+
+
+def default_snapshot_path(db_file: pathlib.Path) -> pathlib.Path:
+    return db_file.with_name(db_file.name + ".schema.json")
+
+
+def _identity(db_file: pathlib.Path) -> dict[str, int]:
+    st = db_file.stat()
+    return {
+        "version": SNAPSHOT_VERSION,
+        "dev": st.st_dev,
+        "ino": st.st_ino,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def load_snapshot(
+    snapshot: pathlib.Path, db_file: pathlib.Path
+) -> typing.Optional[Layout]:
+    """Return the saved layout, or None if it is missing or out of date."""
+    try:
+        with open(snapshot) as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if data.get("database") != _identity(db_file):
+        return None
+    return data["tables"]
+
+
+def save_snapshot(snapshot: pathlib.Path, db_file: pathlib.Path, layout: Layout):
+    data = {"database": _identity(db_file), "tables": layout}
+    tmp = snapshot.with_name(snapshot.name + ".tmp")
+    try:
+        with open(tmp, "w") as fp:
+            json.dump(data, fp)
+        os.replace(tmp, snapshot)
+    except OSError as e:
+        warnings.warn("Unable to write schema snapshot {}: {}".format(snapshot, e))
@@ -0,0 +1,97 @@
+"""Synchronous access to fearow, for scripts and worker processes without
+an event loop.
+
+connect() opens the database with an asqlite3.InlineConnection, which runs
+every query on the calling thread, and prepares the same model classes as
+fearow.connect. The coroutines of the models and of fearow.methods then
+finish without ever suspending, so the functions here run them directly:
+
+    db = fearow.sync.connect()
+    mon = fearow.sync.get(db.PokemonSpecies, 25)
+    pokemon = fearow.sync.related(mon, "pokemons")
+    types = fearow.sync.get_mon_types(mon)
+
+Every coroutine function of fearow.methods has a synchronous counterpart
+here under the same name. run() runs any other awaitable, such as a query
+or a relationship.
+"""
+
+import functools
+import inspect
+import os
+import typing
+
+from asqlite3 import run_inline as run
+
+from . import methods
+from .models import PokeapiModel
+
+__all__ = [
+    "run",
+    "connect",
+    "get",
+    "get_many",
+    "get_named",
+    "get_named_many",
+    "get_random",
+    "related",
+]
+
+_T = typing.TypeVar("_T")
+
+
+def connect(
+    filename: typing.Union[str, os.PathLike] = methods.dbfile,
+    *,
+    storage: str = "file",
+    **options,
+):
+    """Open the database and prepare the model classes, as fearow.connect,
+    which documents the options; readers is not supported."""
+    db = run(methods._open_database(filename, readers=0, storage=storage, inline=True))
+    return run(methods._setup(db, **options))
+
+
+def get(cls: type[_T], id_: int, **kwargs) -> typing.Optional[_T]:
+    return run(cls.get(id_, **kwargs))
+
+
+def get_many(cls: type[_T], ids) -> list[_T]:
+    return run(cls.get_many(ids))
+
+
+def get_named(cls: type[_T], name: str, **kwargs) -> typing.Optional[_T]:
+    return run(cls.get_named(name, **kwargs))
+
+
+def get_named_many(cls: type[_T], name: str, **kwargs) -> list[tuple[_T, float]]:
+    return run(cls.get_named_many(name, **kwargs))
+
+
+def get_random(cls: type[_T], **kwargs) -> typing.Optional[_T]:
+    return run(cls.get_random(**kwargs))
+
+
+def related(obj: PokeapiModel, attrname: str):
+    """Return a relationship or backref of obj, loading it if needed."""
+    return run(getattr(obj, attrname))
+
+
+def _synchronous(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return run(fn(*args, **kwargs))
+
+    return wrapper
+
+
+for _name, _fn in vars(methods).items():
+    if (
+        inspect.iscoroutinefunction(_fn)
+        and _fn.__module__ == methods.__name__
+        and not _name.startswith("_")
+        and _name not in globals()
+    ):
+        globals()[_name] = _synchronous(_fn)
+        __all__.append(_name)
+del _name, _fn
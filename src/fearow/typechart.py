@@ -0,0 +1,125 @@
+import math
+import typing
+from collections.abc import Iterable
+
+import asqlite3
+
+from .derived import Derived
+
+__all__ = ("TypeChart",)
+
+
+class TypeChart(Derived):
+    """The type chart and the types of every species' default form.
+
+    factors[i][j] is the damage multiplier of attacking type type_ids[i]
+    against defending type type_ids[j]; pairs missing from the database
+    count as neutral. species_types maps a species id to the indices of its
+    default form's types, in slot order."""
+
+    def __init__(
+        self,
+        type_ids: list[int],
+        factors: list[list[float]],
+        species_types: dict[int, tuple[int, ...]],
+    ):
+        self.type_ids = type_ids
+        self.type_index = {type_id: i for i, type_id in enumerate(type_ids)}
+        self.factors = factors
+        self.species_types = species_types
+        self._defense: dict[tuple[int, ...], list[float]] = {}
+
+    @classmethod
+    async def _build(cls, connection: asqlite3.Connection) -> "TypeChart":
+        type_ids = [
+            id_
+            for id_, in await connection.execute_fetchall(
+                "select id " "from pokemon_v2_type " "order by id"
+            )
+        ]
+        type_index = {type_id: i for i, type_id in enumerate(type_ids)}
+        factors = [[1.0] * len(type_ids) for _ in type_ids]
+        for (
+            damage_type_id,
+            target_type_id,
+            damage_factor,
+        ) in await connection.execute_fetchall(
+            "select damage_type_id, target_type_id, damage_factor "
+            "from pokemon_v2_typeefficacy"
+        ):
+            factors[type_index[damage_type_id]][type_index[target_type_id]] = (
+                damage_factor / 100.0
+            )
+        species_types: dict[int, list[int]] = {}
+        default_pokemon: dict[int, int] = {}
+        for species_id, pokemon_id, type_id in await connection.execute_fetchall(
+            "select p.pokemon_species_id, p.id, pt.type_id "
+            "from pokemon_v2_pokemon p "
+            "join pokemon_v2_pokemontype pt on pt.pokemon_id = p.id "
+            "where p.is_default "
+            "order by p.id, pt.id"
+        ):
+            # Only the first default form of each species counts, as in
+            # get_default_pokemon.
+            if default_pokemon.setdefault(species_id, pokemon_id) == pokemon_id:
+                species_types.setdefault(species_id, []).append(type_index[type_id])
+        return cls(
+            type_ids,
+            factors,
+            {species_id: tuple(types) for species_id, types in species_types.items()},
+        )
+
+    def defense(self, defending: tuple[int, ...]) -> list[float]:
+        """Multipliers of every attacking type against a combination of type
+        indices, cached per combination."""
+        if (column := self._defense.get(defending)) is None:
+            column = self._defense[defending] = [
+                math.prod(row[j] for j in defending) for row in self.factors
+            ]
+        return column
+
+    def effectiveness(self, attacking_type_id: int, defending_type_ids: Iterable[int]):
+        defending = tuple(self.type_index[type_id] for type_id in defending_type_ids)
+        return self.defense(defending)[self.type_index[attacking_type_id]]
+
+    def matchup(self, species_id: int, attacking_type_id: int) -> float:
+        """Multiplier of an attacking type against a species."""
+        defending = self.species_types.get(species_id, ())
+        return self.defense(defending)[self.type_index[attacking_type_id]]
+
+    def matchup_against_species(self, species_id: int, attacker_id: int) -> list[float]:
+        """Multipliers of each of the attacker's types against a species."""
+        column = self.defense(self.species_types.get(species_id, ()))
+        return [column[i] for i in self.species_types.get(attacker_id, ())]
+
+    def species_by_type(
+        self, species_ids: typing.Optional[Iterable[int]] = None
+    ) -> dict[int, list[float]]:
+        """For each species (all of them by default), the multipliers of
+        every attacking type, in type_ids order."""
+        if species_ids is None:
+            species_ids = self.species_types
+        return {
+            species_id: list(self.defense(self.species_types.get(species_id, ())))
+            for species_id in species_ids
+        }
+
+    def species_by_species(
+        self, species_ids: typing.Optional[Iterable[int]] = None
+    ) -> dict[int, dict[int, list[float]]]:
+        """For each defending species and each attacking species, the
+        multipliers of the attacker's types, as matchup_against_species."""
+        if species_ids is None:
+            species_ids = self.species_types
+        species_ids = list(species_ids)
+        attackers = {
+            species_id: self.species_types.get(species_id, ())
+            for species_id in species_ids
+        }
+        result = {}
+        for species_id, column in self.species_by_type(species_ids).items():
+            result[species_id] = {
+                attacker_id: [column[i] for i in types]
+                for attacker_id, types in attackers.items()
+            }
+        return result
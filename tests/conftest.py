@@ -0,0 +1,11 @@
+import pytest
+
+from fearow import fixtures
+
+
+@pytest.fixture(scope="session")
+def database(tmp_path_factory):
+    """A small synthetic database, shared by the tests that only read it."""
+    path = tmp_path_factory.mktemp("fixture") / "fixture.sqlite3"
+    fixtures.create(path, species=50)
+    return path
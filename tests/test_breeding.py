@@ -0,0 +1,76 @@
+import itertools
+import sqlite3
+
+import pytest
+
+import fearow.sync
+from fearow import fixtures
+
+DITTO_ID = 132
+UNDISCOVERED_EGG_GROUP_ID = 15
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = tmp_path_factory.mktemp("breeding") / "fixture.sqlite3"
+    fixtures.create(path, species=300)
+    return path
+
+
+def _species(path):
+    db = sqlite3.connect(path)
+    try:
+        species = {
+            id_: (gender_rate, bool(is_baby), set())
+            for id_, gender_rate, is_baby in db.execute(
+                "select id, gender_rate, is_baby " "from pokemon_v2_pokemonspecies"
+            )
+        }
+        for species_id, egg_group_id in db.execute(
+            "select pokemon_species_id, egg_group_id " "from pokemon_v2_pokemonegggroup"
+        ):
+            species[species_id][2].add(egg_group_id)
+    finally:
+        db.close()
+    return species
+
+
+def _can_mate(species, mon_id, mate_id):
+    # mon_can_mate_with as it was before BreedingChart.
+    mon_gender_rate, mon_is_baby, mon_egg_groups = species[mon_id]
+    mate_gender_rate, mate_is_baby, mate_egg_groups = species[mate_id]
+    if mon_is_baby or mate_is_baby:
+        return False
+    if mon_id == mate_id:
+        return (
+            mon_id != DITTO_ID
+            and mon_gender_rate not in {0, 8, -1}
+            and UNDISCOVERED_EGG_GROUP_ID not in mon_egg_groups
+        )
+    if mon_id == DITTO_ID or mate_id == DITTO_ID:
+        other_egg_groups = mate_egg_groups if mon_id == DITTO_ID else mon_egg_groups
+        return UNDISCOVERED_EGG_GROUP_ID not in other_egg_groups
+    if (
+        mon_gender_rate == mate_gender_rate == 0
+        or mon_gender_rate == mate_gender_rate == 8
+        or -1 in {mon_gender_rate, mate_gender_rate}
+    ):
+        return False
+    return bool(mon_egg_groups & mate_egg_groups)
+
+
+def test_breeding_chart_matches_pairwise_rules(database):
+    species = _species(database)
+    assert DITTO_ID in species
+    db = fearow.sync.connect(database)
+    try:
+        mons = fearow.sync.get_many(db.PokemonSpecies, sorted(species))
+        mismatches = [
+            (mon.id, mate.id)
+            for mon, mate in itertools.product(mons, repeat=2)
+            if fearow.sync.mon_can_mate_with(mon, mate)
+            != _can_mate(species, mon.id, mate.id)
+        ]
+    finally:
+        fearow.sync.run(db.close())
+    assert mismatches == []
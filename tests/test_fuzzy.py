@@ -0,0 +1,42 @@
+import contextlib
+import difflib
+import shutil
+import sqlite3
+
+import fearow.sync
+from fearow.fuzzy import NameIndex
+
+
+def test_search_excludes_scores_equal_to_cutoff():
+    index = NameIndex([(1, "Pikachu"), (2, "Raichu")])
+    score = difflib.SequenceMatcher(None, "pikachi", "pikachu").ratio()
+    assert index.search("Pikachi", cutoff=score) == []
+    assert index.search("Pikachi", cutoff=score - 0.01) == [(1, score)]
+
+
+def test_search_always_returns_exact_matches():
+    index = NameIndex([(1, "Mr. Mime"), (2, "Mime Jr.")])
+    assert index.search("mr mime", cutoff=1.0) == [(1, 1.0)]
+
+
+def test_name_index_is_rebuilt_on_connect(database, tmp_path):
+    other = tmp_path / "renamed.sqlite3"
+    shutil.copy(database, other)
+    with contextlib.closing(sqlite3.connect(other)) as con, con:
+        con.execute(
+            "update pokemon_v2_pokemonspeciesname "
+            "set name = 'Fearowzer' "
+            "where pokemon_species_id = 22 and language_id = 9"
+        )
+
+    db = fearow.sync.connect(database)
+    try:
+        assert fearow.sync.get_named(db.PokemonSpecies, "Fearowzer") is None
+    finally:
+        fearow.sync.run(db.close())
+    db = fearow.sync.connect(other)
+    try:
+        assert fearow.sync.get_named(db.PokemonSpecies, "Fearowzer").id == 22
+        assert fearow.sync.get_named(db.PokemonSpecies, "Fearowzr").id == 22
+    finally:
+        fearow.sync.run(db.close())
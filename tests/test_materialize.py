@@ -0,0 +1,49 @@
+import asyncio
+import inspect
+
+import pytest
+
+import fearow.sync
+from fearow.models import collection, null
+
+
+def test_missing_relationship_reads_as_null(database):
+    db = fearow.sync.connect(database, materialize=True)
+    try:
+        species = fearow.sync.get_many(db.PokemonSpecies, range(1, 51))
+        base = next(mon for mon in species if mon.evolves_from_species_id is None)
+        evolved = next(mon for mon in species if mon.evolves_from_species_id)
+    finally:
+        fearow.sync.run(db.close())
+
+    assert base.evolves_from_species is null
+    assert not base.evolves_from_species
+    assert base.evolves_from_species == None  # noqa: E711
+    assert base.evolves_from_species is not None
+    assert fearow.sync.run(base.evolves_from_species) is None
+
+    parent = evolved.evolves_from_species
+    assert parent.id == evolved.evolves_from_species_id
+    assert fearow.sync.run(parent) is parent
+    assert isinstance(parent.pokemons, collection)
+    assert fearow.sync.run(parent.pokemons) is parent.pokemons
+
+
+def test_models_are_awaitable_only_while_materialized(database):
+    db = fearow.sync.connect(database, materialize=True)
+    fearow.sync.run(db.close())
+    db = fearow.sync.connect(database)
+    try:
+        mon = fearow.sync.get(db.PokemonSpecies, 1)
+        pokemons = fearow.sync.related(mon, "pokemons")
+    finally:
+        fearow.sync.run(db.close())
+
+    assert not inspect.isawaitable(mon)
+    assert not inspect.isawaitable(pokemons)
+    with pytest.raises(TypeError):
+        asyncio.run(_await(mon))
+
+
+async def _await(value):
+    return await value
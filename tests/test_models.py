@@ -0,0 +1,65 @@
+import contextlib
+import shutil
+import sqlite3
+
+import asqlite3
+import fearow.sync
+from fearow import PokeapiModel
+
+
+def _layout(path):
+    db = asqlite3.run_inline(asqlite3.connect_inline(path))
+    try:
+        return asqlite3.run_inline(PokeapiModel._introspect(db))
+    finally:
+        asqlite3.run_inline(db.close())
+
+
+def test_compact_classes_compile_keyword_columns(database):
+    classes = PokeapiModel._build_classes(_layout(database), compact=True)
+    PokemonMove = classes["PokemonMove"]
+    assert "order" in PokemonMove.__columns__
+    assert PokemonMove._assign_columns is not PokeapiModel._assign_columns
+    row = tuple(range(len(PokemonMove.__columns__)))
+    move = PokemonMove._detached(row + ("extra",))
+    assert tuple(value for _, value in move) == row
+
+
+def test_reconnect_reloads_names(database, tmp_path):
+    other = tmp_path / "renamed.sqlite3"
+    shutil.copy(database, other)
+    with contextlib.closing(sqlite3.connect(other)) as con, con:
+        con.execute(
+            "update pokemon_v2_pokemonspeciesname "
+            "set name = 'Renamed' "
+            "where pokemon_species_id = 25 and language_id = 9"
+        )
+
+    db = fearow.sync.connect(database)
+    try:
+        assert fearow.sync.get(db.PokemonSpecies, 25).qualified_name != "Renamed"
+    finally:
+        fearow.sync.run(db.close())
+    db = fearow.sync.connect(other)
+    try:
+        assert fearow.sync.get(db.PokemonSpecies, 25).qualified_name == "Renamed"
+        assert fearow.sync.get(db.PokemonSpecies, 26).qualified_name is not None
+    finally:
+        fearow.sync.run(db.close())
+
+
+def test_get_random_keys_named_parameters_by_value(database):
+    db = fearow.sync.connect(database)
+    try:
+        for gender_rate in (-1, 8, -1):
+            mons = fearow.sync.run(
+                db.PokemonSpecies.get_random_many(
+                    5,
+                    unique=False,
+                    where="gender_rate = :gender_rate",
+                    parameters={"gender_rate": gender_rate},
+                )
+            )
+            assert {mon.gender_rate for mon in mons} == {gender_rate}
+    finally:
+        fearow.sync.run(db.close())
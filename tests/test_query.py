@@ -0,0 +1,15 @@
+import pytest
+
+import fearow.sync
+
+
+def test_where_rejects_named_parameters(database):
+    db = fearow.sync.connect(database)
+    try:
+        species = db.PokemonSpecies
+        with pytest.raises(TypeError):
+            species.where("gender_rate = :gender_rate", {"gender_rate": 8})
+        mons = fearow.sync.run(species.where("gender_rate = ?", [8]))
+        assert {mon.gender_rate for mon in mons} == {8}
+    finally:
+        fearow.sync.run(db.close())